@@ -10,6 +10,7 @@ mkdir -p "dist/$PACKAGE_NAME"
 
 # Copy essential files
 cp youtube_api_fuse.py "dist/$PACKAGE_NAME/"
+cp rate_limiting.py "dist/$PACKAGE_NAME/"
 cp requirements.txt "dist/$PACKAGE_NAME/"
 cp setup.sh "dist/$PACKAGE_NAME/"
 cp README.md "dist/$PACKAGE_NAME/"
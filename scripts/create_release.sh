@@ -15,6 +15,7 @@ echo "📦 Packaging distribution files..."
 
 # Copy core files
 cp youtube_api_fuse.py "releases/$RELEASE_NAME/"
+cp rate_limiting.py "releases/$RELEASE_NAME/"
 cp requirements.txt "releases/$RELEASE_NAME/"
 cp setup.sh "releases/$RELEASE_NAME/"
 cp README.md "releases/$RELEASE_NAME/"
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+API rate limiting shared by the filesystem and the playlist tools
+Standard library only, so tools can import it without fusepy or yt-dlp
+"""
+
+import threading
+import time
+
+class TokenBucket:
+    """Thread-safe token bucket: bursts of up to `burst` calls, then `rate` calls per second"""
+    def __init__(self, rate, burst):
+        self.rate = rate  # Tokens added per second (0 = unlimited)
+        self.burst = max(1, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.acquired = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, quota_config):
+        """Build a bucket from the quota_management config section"""
+        rate_limit_delay = quota_config.get('rate_limit_delay', 1.0)
+        default_rate = 1.0 / rate_limit_delay if rate_limit_delay > 0 else 0
+        return cls(
+            rate=quota_config.get('rate_limit_per_second', default_rate),
+            burst=quota_config.get('rate_limit_burst', 5)
+        )
+    
+    def acquire(self, tokens=1):
+        """Take tokens, sleeping until they are available; returns seconds waited"""
+        with self.lock:
+            self.acquired += 1
+            if self.rate <= 0:
+                return 0.0
+            
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            
+            # Going negative reserves future tokens, so concurrent callers queue up fairly
+            self.tokens -= tokens
+            wait = max(0.0, -self.tokens / self.rate)
+            if wait > 0:
+                self.waits += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+        
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    def get_stats(self):
+        """Return call and wait-time counters"""
+        with self.lock:
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'acquired': self.acquired,
+                'waits': self.waits,
+                'total_wait': self.total_wait,
+                'max_wait': self.max_wait,
+                'avg_wait': self.total_wait / self.acquired if self.acquired else 0
+            }
@@ -7,28 +7,1234 @@ import stat
 import threading
 import time
 import json
+import re
+import heapq
+import itertools
+import random
+import queue
+import multiprocessing
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
+from urllib.parse import urlparse, parse_qs
 from fuse import FUSE, FuseOSError, Operations
 import yt_dlp
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from googleapiclient.discovery import build
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 import pytz
+from rate_limiting import TokenBucket
+
+def write_json_atomic(path, data):
+    """Write JSON to path via a temp file so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+
+ISO8601_DURATION = re.compile(
+    r'P(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$')
+
+def parse_iso8601_duration(duration):
+    """Convert a YouTube contentDetails duration (e.g. PT1H2M3S) to seconds, or None"""
+    match = ISO8601_DURATION.match(duration or '')
+    if not match:
+        return None
+    parts = {key: int(value or 0) for key, value in match.groupdict().items()}
+    return parts['days'] * 86400 + parts['hours'] * 3600 + parts['minutes'] * 60 + parts['seconds']
+
+# API call priority classes (lower value = served first)
+PRIORITY_INTERACTIVE = 0  # User-visible playlists: Watch Later and configured playlists
+PRIORITY_CHANGE_DETECTION = 1  # ETag checks that decide what to refresh
+PRIORITY_BULK = 2  # Auto-discovery sweeps and auto-discovered playlists
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: 'interactive',
+    PRIORITY_CHANGE_DETECTION: 'change_detection',
+    PRIORITY_BULK: 'bulk'
+}
+
+class ApiCallScheduler:
+    """Priority queue that decides which waiting API call takes the next rate-limit token"""
+    def __init__(self):
+        self.waiting = {}  # {endpoint: heap of (priority, sequence)}
+        self.busy = set()  # Endpoints with a call currently taking its token
+        self.sequence = itertools.count()  # FIFO within a priority class
+        self.condition = threading.Condition()
+    
+    def acquire(self, endpoint, priority):
+        """Block until this call is the highest-priority waiter for the endpoint"""
+        with self.condition:
+            ticket = (priority, next(self.sequence))
+            queue = self.waiting.setdefault(endpoint, [])
+            heapq.heappush(queue, ticket)
+            while endpoint in self.busy or queue[0] != ticket:
+                self.condition.wait()
+            heapq.heappop(queue)
+            self.busy.add(endpoint)
+    
+    def release(self, endpoint):
+        with self.condition:
+            self.busy.discard(endpoint)
+            self.condition.notify_all()
+    
+    def queue_length(self):
+        with self.condition:
+            return sum(len(queue) for queue in self.waiting.values())
+
+class QuotaLedger:
+    """Append-only JSON-lines log of quota spend, fsynced in batches"""
+    def __init__(self, path, fsync_batch=10, fsync_interval=5.0, keep_days=30):
+        self.path = path
+        self.fsync_batch = fsync_batch  # fsync after this many entries...
+        self.fsync_interval = fsync_interval  # ...or this many seconds, whichever first
+        self.keep_days = keep_days
+        self.pending = 0
+        self.last_fsync = time.time()
+        self.file = None
+        self.lock = threading.Lock()
+    
+    def load(self, quota_day):
+        """Return (quota_used, call_count) recorded for a quota day, dropping old days"""
+        usage = 0
+        calls = 0
+        kept = []
+        cutoff = (datetime.strptime(quota_day, '%Y-%m-%d') - timedelta(days=self.keep_days)).strftime('%Y-%m-%d')
+        
+        try:
+            with open(self.path, 'r') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return 0, 0
+        
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Torn write from a crash
+            if entry['day'] < cutoff:
+                continue
+            kept.append(line if line.endswith('\n') else line + '\n')
+            if entry['day'] == quota_day:
+                usage += entry['cost']
+                calls += 1
+        
+        if kept != lines:
+            # Compact the ledger so it does not grow forever, and so a torn last
+            # line never swallows the next appended entry
+            tmp_file = f"{self.path}.tmp"
+            with open(tmp_file, 'w') as f:
+                f.writelines(kept)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.path)
+        
+        return usage, calls
+    
+    def record(self, quota_day, operation_type, quota_cost):
+        """Append one API call to the ledger"""
+        entry = {'ts': time.time(), 'day': quota_day, 'op': operation_type, 'cost': quota_cost}
+        with self.lock:
+            if self.file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self.file = open(self.path, 'a')
+            self.file.write(json.dumps(entry) + '\n')
+            self.pending += 1
+            
+            if self.pending >= self.fsync_batch or time.time() - self.last_fsync >= self.fsync_interval:
+                self._sync()
+    
+    def flush(self):
+        """Force pending entries to disk"""
+        with self.lock:
+            if self.file is not None and self.pending:
+                self._sync()
+    
+    def _sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+        self.last_fsync = time.time()
+
+# Immutable view of playlist metadata; replaced as a whole, never modified in place
+# (except `missing`, the set of paths getattr found absent in this snapshot)
+MetadataSnapshot = namedtuple('MetadataSnapshot', ['playlists', 'dir_index', 'file_index', 'missing'])
+MAX_MISSING_PATHS = 10000  # Negative entries remembered per snapshot
+
+def extract_stream(ydl, video_id):
+    """Resolve a video with an open YoutubeDL; returns (stream_url, size, duration)"""
+    info = ydl.extract_info(f'https://youtube.com/watch?v={video_id}', download=False)
+    
+    # Serve the format video_quality selected - the same one offline downloads store
+    stream_url = info.get('url')
+    stream_size = info.get('filesize') or info.get('filesize_approx')
+    if not stream_url and 'formats' in info:
+        # Merged selections have no single URL - fall back to the first progressive mp4
+        for fmt in info['formats']:
+            if fmt.get('url') and fmt.get('ext') == 'mp4':
+                stream_url = fmt['url']
+                stream_size = fmt.get('filesize') or fmt.get('filesize_approx')
+                break
+    
+    return stream_url, stream_size, info.get('duration')
+
+class ExtractorPool:
+    """Long-lived YoutubeDL instances reused across extractions (one caller per instance)"""
+    LATENCY_BUCKETS = [0.5, 1, 2, 5, 10, 30]  # Histogram upper bounds in seconds
+    
+    def __init__(self, ydl_opts, size=2):
+        self.ydl_opts = ydl_opts
+        self.size = max(1, size)
+        self.idle = queue.LifoQueue()  # Most recently used instance is the warmest
+        self.created = 0
+        self.lock = threading.Lock()
+        self.extractions = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.histogram = [0] * (len(self.LATENCY_BUCKETS) + 1)
+    
+    def acquire(self):
+        """Take an idle instance, creating one while under the pool size"""
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if self.created < self.size:
+                self.created += 1
+                return yt_dlp.YoutubeDL(self.ydl_opts)
+        return self.idle.get()
+    
+    def extract(self, video_id):
+        ydl = self.acquire()
+        started = time.time()
+        try:
+            return extract_stream(ydl, video_id)
+        except Exception:
+            with self.lock:
+                self.failures += 1
+            raise
+        finally:
+            self.record_latency(time.time() - started)
+            self.idle.put(ydl)
+    
+    def close(self):
+        """Release idle instances (their cookie jars and open connections)"""
+        while True:
+            try:
+                ydl = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            with self.lock:
+                self.created -= 1
+            ydl.close()
+    
+    def record_latency(self, seconds):
+        with self.lock:
+            self.extractions += 1
+            self.total_latency += seconds
+            for index, bound in enumerate(self.LATENCY_BUCKETS):
+                if seconds <= bound:
+                    self.histogram[index] += 1
+                    break
+            else:
+                self.histogram[-1] += 1
+    
+    def get_stats(self):
+        with self.lock:
+            labels = [f'<={bound}s' for bound in self.LATENCY_BUCKETS] + [f'>{self.LATENCY_BUCKETS[-1]}s']
+            return {
+                'instances': self.created,
+                'extractions': self.extractions,
+                'failures': self.failures,
+                'avg_latency': self.total_latency / self.extractions if self.extractions else 0,
+                'latency_histogram': dict(zip(labels, self.histogram))
+            }
+
+class SingleFlight:
+    """Run a function once per key at a time; concurrent callers share its result or error"""
+    def __init__(self):
+        self.calls = {}  # {key: {done, result, error}} for calls in flight
+        self.lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+    
+    def do(self, key, func):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = {'done': threading.Event(), 'result': None, 'error': None}
+            else:
+                self.shared += 1
+        
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+        
+        try:
+            call['result'] = func()
+            return call['result']
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+                self.executed += 1
+            call['done'].set()
+    
+    def get_stats(self):
+        with self.lock:
+            return {
+                'in_flight': len(self.calls),
+                'executed': self.executed,
+                'shared': self.shared
+            }
+
+# Long-lived YoutubeDL owned by a resolver worker process
+worker_ydl = None
+
+def init_resolver_worker(ydl_opts):
+    global worker_ydl
+    worker_ydl = yt_dlp.YoutubeDL(ydl_opts)
+
+def resolve_in_worker(video_id):
+    """Runs in a resolver process; returns (stream_url, size, duration, seconds taken)"""
+    started = time.time()
+    try:
+        return extract_stream(worker_ydl, video_id) + (time.time() - started,)
+    except Exception as e:
+        # yt-dlp errors carry unpicklable loggers - send back just the message
+        raise RuntimeError(str(e)) from None
+
+class StreamResolver:
+    """Runs yt-dlp extraction in worker processes so it never holds the FUSE process GIL"""
+    def __init__(self, extractor_pool, workers=2, max_queue=16, timeout=60):
+        self.extractor_pool = extractor_pool  # Used in-process when workers is 0
+        self.workers = workers
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(max(1, workers) + max_queue)
+        self.executor = None
+        self.pending = 0  # Lookups queued or running in a worker
+        self.lock = threading.RLock()  # Done callbacks can run inside submit's critical section
+        self.rejected = 0
+        self.timeouts = 0
+        self.worker_restarts = 0
+    
+    def get_executor(self):
+        """Start the worker processes on first use (lock held)"""
+        if self.executor is None:
+            # spawn, not fork: the FUSE process is full of threads and open sockets
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_resolver_worker,
+                initargs=(self.extractor_pool.ydl_opts,)
+            )
+        return self.executor
+    
+    def resolve(self, video_id):
+        """Return (stream_url, size, duration); raises on timeout, overload or failure"""
+        if self.workers <= 0:
+            return self.extractor_pool.extract(video_id)
+        
+        # Callers coalesce duplicate lookups for a video before they get here
+        with self.lock:
+            if not self.slots.acquire(blocking=False):
+                self.rejected += 1
+                raise RuntimeError(f"resolver queue full ({self.pending} pending)")
+            try:
+                executor = self.get_executor()
+                try:
+                    future = executor.submit(resolve_in_worker, video_id)
+                except BrokenProcessPool:
+                    self.restart(executor)
+                    executor = self.get_executor()
+                    future = executor.submit(resolve_in_worker, video_id)
+            except Exception:
+                self.slots.release()
+                raise
+            self.pending += 1
+            future.add_done_callback(self.finished)
+        
+        try:
+            stream_url, stream_size, duration, seconds = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self.lock:
+                self.timeouts += 1
+            raise RuntimeError(f"resolver timed out after {self.timeout}s")
+        except BrokenProcessPool:
+            with self.lock:
+                self.restart(executor)
+            raise
+        
+        self.extractor_pool.record_latency(seconds)
+        return stream_url, stream_size, duration
+    
+    def finished(self, future):
+        with self.lock:
+            self.pending -= 1
+        self.slots.release()
+    
+    def restart(self, executor):
+        """Replace a pool whose worker died (lock held)"""
+        # Every caller of a broken pool gets here - only the first replaces it, so a
+        # fresh pool and the lookups queued on it are left alone
+        if self.executor is not executor:
+            return
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = None
+        self.worker_restarts += 1
+    
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+    
+    def get_stats(self):
+        with self.lock:
+            return {
+                'workers': self.workers,
+                'pending': self.pending,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'worker_restarts': self.worker_restarts
+            }
+
+class StreamUrlCache:
+    """Resolved stream URLs with their real expiry, LRU-bounded and persisted to disk"""
+    def __init__(self, path, max_entries=500, default_ttl=1800, expiry_margin=60):
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl  # Used when the URL carries no expire= parameter
+        self.expiry_margin = expiry_margin  # Treat URLs this close to expiry as expired
+        self.entries = OrderedDict()  # {video_id: {url, content_length, expires, resolved_at}}
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def parse_expiry(self, url):
+        """Read the expiry timestamp googlevideo URLs carry as ?expire= or /expire/.../"""
+        parsed = urlparse(url)
+        expire = parse_qs(parsed.query).get('expire', [None])[0]
+        if expire is None:
+            parts = parsed.path.split('/')
+            if 'expire' in parts and parts.index('expire') + 1 < len(parts):
+                expire = parts[parts.index('expire') + 1]
+        try:
+            return float(expire)
+        except (TypeError, ValueError):
+            return time.time() + self.default_ttl
+    
+    def get(self, video_id):
+        """Return the cached entry if its URL is still usable, else None"""
+        with self.lock:
+            entry = self.peek(video_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(video_id)
+            self.hits += 1
+            return entry
+    
+    def peek(self, video_id):
+        """Return a usable entry without touching LRU order or hit counters"""
+        entry = self.entries.get(video_id)
+        if entry is None or entry['expires'] - self.expiry_margin <= time.time():
+            return None
+        return entry
+    
+    def put(self, video_id, url, content_length=None):
+        entry = {
+            'url': url,
+            'content_length': content_length,
+            'expires': self.parse_expiry(url),
+            'resolved_at': time.time()
+        }
+        with self.lock:
+            self.entries[video_id] = entry
+            self.entries.move_to_end(video_id)
+            self.evict()
+            self.dirty = True
+        return entry
+    
+    def set_content_length(self, video_id, content_length):
+        with self.lock:
+            entry = self.entries.get(video_id)
+            if entry and entry.get('content_length') != content_length:
+                entry['content_length'] = content_length
+                self.dirty = True
+    
+    def invalidate(self, video_id, url=None):
+        """Drop a video's entry (only if it still holds url, when given)"""
+        with self.lock:
+            entry = self.entries.get(video_id)
+            if entry and (url is None or entry['url'] == url):
+                del self.entries[video_id]
+                self.dirty = True
+    
+    def expiring(self, video_ids, within):
+        """Video IDs whose cached URL expires within the given number of seconds"""
+        deadline = time.time() + within
+        with self.lock:
+            return [video_id for video_id in video_ids
+                    if video_id in self.entries and self.entries[video_id]['expires'] <= deadline]
+    
+    def evict(self):
+        """Drop expired entries, then least recently used ones over the limit (lock held)"""
+        now = time.time()
+        for video_id in [key for key, entry in self.entries.items() if entry['expires'] <= now]:
+            del self.entries[video_id]
+            self.evictions += 1
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+    
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return 0
+        
+        with self.lock:
+            self.entries = OrderedDict(sorted(entries.items(), key=lambda item: item[1]['resolved_at']))
+            self.evict()
+            return len(self.entries)
+    
+    def save(self):
+        """Write the cache if it changed since the last save"""
+        with self.lock:
+            if not self.dirty:
+                return
+            entries = dict(self.entries)
+            self.dirty = False
+        write_json_atomic(self.path, entries)
+    
+    def get_stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits / total) * 100 if total else 0
+            }
+
+class ChunkCache:
+    """Thread-safe LRU cache of aligned stream chunks with a global byte budget"""
+    def __init__(self, chunk_size, max_bytes):
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        self.chunks = OrderedDict()  # {(video_id, chunk_index): bytes}, oldest first
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+    
+    def get(self, video_id, chunk_index):
+        """Return cached chunk data (marking it recently used) or None"""
+        key = (video_id, chunk_index)
+        with self.lock:
+            data = self.chunks.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self.chunks.move_to_end(key)
+            self.hits += 1
+            return data
+    
+    def put(self, video_id, chunk_index, data):
+        """Store a chunk and evict least recently used chunks over the budget"""
+        if not data or len(data) > self.max_bytes:
+            return
+        key = (video_id, chunk_index)
+        with self.lock:
+            old = self.chunks.pop(key, None)
+            if old is not None:
+                self.current_bytes -= len(old)
+            self.chunks[key] = data
+            self.current_bytes += len(data)
+            
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self.chunks.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                self.evictions += 1
+    
+    def contains(self, video_id, chunk_index):
+        """Check for a chunk without touching LRU order or counters"""
+        with self.lock:
+            return (video_id, chunk_index) in self.chunks
+    
+    def invalidate(self, video_id):
+        """Drop every cached chunk belonging to a video"""
+        with self.lock:
+            for key in [k for k in self.chunks if k[0] == video_id]:
+                self.current_bytes -= len(self.chunks.pop(key))
+    
+    def get_stats(self):
+        """Return hit/miss counters and memory usage"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'chunk_size': self.chunk_size,
+                'max_bytes': self.max_bytes,
+                'current_bytes': self.current_bytes,
+                'chunks': len(self.chunks),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits / lookups) * 100 if lookups else 0
+            }
+
+class SegmentCache:
+    """On-disk chunk cache: one sparse file per video, LRU-evicted by video under a byte budget"""
+    def __init__(self, directory, chunk_size, max_bytes, save_interval=30):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        self.save_interval = save_interval  # Seconds between index writes
+        self.index_file = os.path.join(directory, 'index.json')
+        self.videos = OrderedDict()  # {video_id: {chunks: {index: length}, bytes, hits}}, LRU first
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.oversized = 0  # Chunks not cached because their video would exceed max_bytes
+        self.generation = 0  # Bumped whenever a video's file is (re)created
+        self.last_save = 0
+        self.dirty = False
+        self.lock = threading.Lock()
+    
+    def path(self, video_id):
+        return os.path.join(self.directory, f'{video_id}.data')
+    
+    def covers(self, video_id, first_chunk, last_chunk):
+        """Return the file generation if every chunk in the range is on disk, else None"""
+        with self.lock:
+            entry = self.videos.get(video_id)
+            if entry is None:
+                return None
+            chunks = entry['chunks']
+            for chunk_index in range(first_chunk, last_chunk + 1):
+                length = chunks.get(chunk_index)
+                if length is None:
+                    return None
+                if length < self.chunk_size:
+                    break  # Last chunk of the video - nothing exists past it
+            self.videos.move_to_end(video_id)
+            entry['hits'] += 1
+            self.hits += 1
+            return entry['generation']
+    
+    def chunk_length(self, video_id, chunk_index):
+        """Length of a chunk on disk (without counting a hit), or None"""
+        with self.lock:
+            entry = self.videos.get(video_id)
+            return entry['chunks'].get(chunk_index) if entry else None
+    
+    def load(self):
+        """Restore the index, dropping it if the chunk size changed or files went missing"""
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            with open(self.index_file, 'r') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            index = {}
+        
+        if index.get('chunk_size') != self.chunk_size:
+            index['videos'] = {}  # Chunk boundaries moved - cached files are useless
+        
+        with self.lock:
+            for video_id, entry in index.get('videos', {}).items():
+                if not os.path.exists(self.path(video_id)):
+                    continue
+                entry['chunks'] = {int(chunk): length for chunk, length in entry['chunks'].items()}
+                self.generation += 1
+                entry['generation'] = self.generation
+                entry['writing'] = set()  # Chunks with space reserved but not written yet
+                self.videos[video_id] = entry
+                self.current_bytes += entry['bytes']
+            
+            # Delete data files the index does not know about (e.g. after a crash)
+            for name in os.listdir(self.directory):
+                if name.endswith('.data') and name[:-len('.data')] not in self.videos:
+                    os.remove(os.path.join(self.directory, name))
+            
+            self.evict()
+            return len(self.videos)
+    
+    def get(self, video_id, chunk_index):
+        """Return the chunk from disk or None"""
+        with self.lock:
+            entry = self.videos.get(video_id)
+            length = entry['chunks'].get(chunk_index) if entry else None
+            if length is None:
+                self.misses += 1
+                return None
+            self.videos.move_to_end(video_id)
+            entry['hits'] += 1
+            self.hits += 1
+        
+        try:
+            fd = os.open(self.path(video_id), os.O_RDONLY)
+        except FileNotFoundError:
+            self.invalidate(video_id)  # Evicted (or deleted) under us
+            return None
+        try:
+            data = os.pread(fd, length, chunk_index * self.chunk_size)
+        finally:
+            os.close(fd)
+        return data if len(data) == length else None
+    
+    def put(self, video_id, chunk_index, data):
+        """Write a chunk at its offset in the video's file and evict over the budget"""
+        if not data:
+            return
+        with self.lock:
+            entry = self.videos.get(video_id)
+            if entry and (chunk_index in entry['chunks'] or chunk_index in entry['writing']):
+                return
+            if (entry['bytes'] if entry else 0) + len(data) > self.max_bytes:
+                self.oversized += 1  # This video alone would exceed the budget - stream the rest
+                return
+            
+            # Reserve the space before writing so concurrent puts can't overshoot the budget
+            if entry is None:
+                self.generation += 1
+                entry = self.videos[video_id] = {'chunks': {}, 'bytes': 0, 'hits': 0,
+                                                 'generation': self.generation, 'writing': set()}
+            entry['writing'].add(chunk_index)
+            entry['bytes'] += len(data)
+            self.current_bytes += len(data)
+            self.videos.move_to_end(video_id)
+            self.evict(keep=video_id)
+        
+        try:
+            fd = os.open(self.path(video_id), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                os.pwrite(fd, data, chunk_index * self.chunk_size)
+            finally:
+                os.close(fd)
+        except OSError:
+            with self.lock:
+                if self.videos.get(video_id) is entry:
+                    entry['writing'].discard(chunk_index)
+                    entry['bytes'] -= len(data)
+                    self.current_bytes -= len(data)
+            raise
+        
+        with self.lock:
+            if self.videos.get(video_id) is not entry:
+                # Evicted while we were writing - don't leave an unindexed file behind
+                if video_id not in self.videos:
+                    try:
+                        os.remove(self.path(video_id))
+                    except FileNotFoundError:
+                        pass
+                return
+            entry['writing'].discard(chunk_index)
+            entry['chunks'][chunk_index] = len(data)
+            self.dirty = True
+        
+        if time.time() - self.last_save > self.save_interval:
+            self.save()
+    
+    def evict(self, keep=None):
+        """Remove least recently used videos until under budget (lock held)"""
+        for video_id in list(self.videos):
+            if self.current_bytes <= self.max_bytes:
+                break
+            if video_id == keep:
+                continue
+            self.remove(video_id)
+            self.evictions += 1
+    
+    def remove(self, video_id):
+        """Forget a video and delete its file (lock held)"""
+        entry = self.videos.pop(video_id, None)
+        if entry is None:
+            return
+        self.current_bytes -= entry['bytes']
+        self.dirty = True
+        try:
+            os.remove(self.path(video_id))
+        except FileNotFoundError:
+            pass
+    
+    def invalidate(self, video_id):
+        with self.lock:
+            self.remove(video_id)
+    
+    def save(self):
+        """Write the index if it changed since the last save"""
+        with self.lock:
+            if not self.dirty:
+                return
+            index = {'chunk_size': self.chunk_size, 'videos': {
+                video_id: {
+                    'chunks': dict(entry['chunks']),
+                    'bytes': sum(entry['chunks'].values()),  # Pending writes don't survive a restart
+                    'hits': entry['hits']
+                }
+                for video_id, entry in self.videos.items()
+            }}
+            self.dirty = False
+            self.last_save = time.time()
+        try:
+            write_json_atomic(self.index_file, index)
+        except Exception as e:
+            print(f"Error saving segment cache index {self.index_file}: {e}")
+    
+    def get_stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'max_bytes': self.max_bytes,
+                'current_bytes': self.current_bytes,
+                'videos': len(self.videos),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'oversized': self.oversized,
+                'hit_rate': (self.hits / lookups) * 100 if lookups else 0
+            }
+
+class OfflineMirror:
+    """Background yt-dlp downloads of pinned playlists into a local store under a disk budget"""
+    def __init__(self, directory, ydl_opts, max_bytes, on_complete=None):
+        self.directory = directory
+        self.ydl_opts = ydl_opts  # Throttling and resume options for yt-dlp
+        self.max_bytes = max_bytes
+        self.on_complete = on_complete  # Called with (video_id, size) after each download
+        self.files = {}  # {video_id: size} of completed downloads
+        self.wanted = []  # Video IDs of pinned playlists, in download order
+        self.failed = {}  # {video_id: time of last failure} so bad videos are retried slowly
+        self.downloading = None
+        self.downloads = 0
+        self.download_failures = 0
+        self.budget_skips = 0
+        self.condition = threading.Condition()
+        self.thread = None
+        self.stopped = False
+    
+    def path(self, video_id):
+        return os.path.join(self.directory, f'{video_id}.video')
+    
+    def load(self):
+        """Index completed downloads (partial .part files are resumed later)"""
+        os.makedirs(self.directory, exist_ok=True)
+        with self.condition:
+            for name in os.listdir(self.directory):
+                if name.endswith('.video'):
+                    self.files[name[:-len('.video')]] = os.path.getsize(os.path.join(self.directory, name))
+            return dict(self.files)
+    
+    def size(self, video_id):
+        """Size of a completed download, or None"""
+        with self.condition:
+            return self.files.get(video_id)
+    
+    def downloaded(self):
+        with self.condition:
+            return dict(self.files)
+    
+    def local_path(self, video_id):
+        """Path of a completed download, or None"""
+        with self.condition:
+            return self.path(video_id) if video_id in self.files else None
+    
+    def current_bytes(self):
+        with self.condition:
+            return sum(self.files.values())
+    
+    def sync(self, video_ids, prune=True):
+        """Set the videos to mirror; with prune, files no longer pinned are deleted"""
+        with self.condition:
+            self.wanted = list(dict.fromkeys(video_ids))
+            wanted = set(self.wanted)
+            if prune:
+                for video_id in [video_id for video_id in self.files if video_id not in wanted]:
+                    self.delete(video_id)
+            self.condition.notify_all()
+    
+    def delete(self, video_id):
+        """Remove a video's download and any partial download (lock held)"""
+        self.files.pop(video_id, None)
+        for path in (self.path(video_id), f'{self.path(video_id)}.part'):
+            try:
+                os.remove(path)  # Open handles keep reading the unlinked file
+            except FileNotFoundError:
+                pass
+    
+    def next_download(self):
+        """Pick the first pinned video not downloaded yet (lock held)"""
+        for video_id in self.wanted:
+            if video_id in self.files:
+                continue
+            if time.time() - self.failed.get(video_id, 0) < 3600:
+                continue
+            return video_id
+        return None
+    
+    def start(self):
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+    
+    def run(self):
+        while True:
+            with self.condition:
+                video_id = self.next_download()
+                while not self.stopped and video_id is None:
+                    self.condition.wait(timeout=600)  # Also retries failed downloads eventually
+                    video_id = self.next_download()
+                if self.stopped:
+                    return
+                
+                remaining = self.max_bytes - sum(self.files.values())
+                if remaining <= 0:
+                    self.budget_skips += 1
+                    print(f"💾 Offline store full ({self.max_bytes / (1024 ** 3):.1f}GB) - pausing downloads")
+                    self.condition.wait(timeout=600)
+                    continue
+                self.downloading = video_id
+            
+            try:
+                self.download(video_id, remaining)
+            finally:
+                with self.condition:
+                    self.downloading = None
+    
+    def download(self, video_id, remaining):
+        """Fetch one video with yt-dlp; resumes a .part file left by an earlier run"""
+        print(f"⬇️ Downloading {video_id} for offline playback")
+        ydl_opts = dict(self.ydl_opts, outtmpl=self.path(video_id), max_filesize=remaining)
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                ydl.download([f'https://youtube.com/watch?v={video_id}'])
+        except Exception as e:
+            print(f"Error downloading {video_id} for offline playback: {e}")
+        
+        with self.condition:
+            if not os.path.exists(self.path(video_id)):
+                # yt-dlp skips files over max_filesize without raising
+                self.download_failures += 1
+                self.failed[video_id] = time.time()
+                return
+            size = os.path.getsize(self.path(video_id))
+            self.files[video_id] = size
+            self.downloads += 1
+        
+        print(f"✅ {video_id} available offline ({size / (1024 * 1024):.0f}MB)")
+        if self.on_complete:
+            self.on_complete(video_id, size)
+    
+    def get_stats(self):
+        with self.condition:
+            return {
+                'max_bytes': self.max_bytes,
+                'current_bytes': sum(self.files.values()),
+                'videos': len(self.files),
+                'pinned': len(self.wanted),
+                'downloading': self.downloading,
+                'downloads': self.downloads,
+                'failures': self.download_failures,
+                'budget_pauses': self.budget_skips
+            }
+
+class AccessTracker:
+    """Detect sequential streaming from the offsets of consecutive reads"""
+    def __init__(self, threshold):
+        self.threshold = threshold  # Contiguous reads needed before we call it sequential
+        self.next_offset = None
+        self.sequential_reads = 0
+    
+    def record(self, offset, length):
+        """Record a read and return True if the file is being streamed sequentially"""
+        if offset == self.next_offset:
+            self.sequential_reads += 1
+        else:
+            self.sequential_reads = 0  # Seek
+        self.next_offset = offset + length
+        return self.sequential_reads >= self.threshold
+
+class Prefetcher:
+    """Background thread that keeps the chunk cache filled ahead of a sequential reader"""
+    def __init__(self, fuse_system, handle, window_chunks):
+        self.fuse_system = fuse_system
+        self.handle = handle
+        self.video_id = handle.video['id']
+        self.window_chunks = window_chunks
+        self.reader_chunk = 0
+        self.eof_chunk = None  # Index of the last (short) chunk once we have seen it
+        self.stopped = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+    
+    def start(self, reader_chunk):
+        self.reader_chunk = reader_chunk
+        self.thread.start()
+    
+    def advance(self, reader_chunk):
+        """Tell the prefetcher where the reader is now"""
+        with self.condition:
+            if reader_chunk != self.reader_chunk:
+                self.reader_chunk = reader_chunk
+                self.condition.notify()
+    
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+    
+    def next_missing_chunk(self):
+        """Return the first chunk inside the window that is not cached yet"""
+        cache = self.fuse_system.chunk_cache
+        for chunk_index in range(self.reader_chunk + 1, self.reader_chunk + 1 + self.window_chunks):
+            if self.eof_chunk is not None and chunk_index > self.eof_chunk:
+                break
+            if cache.contains(self.video_id, chunk_index):
+                continue
+            # Chunks on disk are read straight from the segment cache - no need to load them
+            segments = self.fuse_system.segment_cache
+            length = segments.chunk_length(self.video_id, chunk_index) if segments else None
+            if length is None:
+                return chunk_index
+            if length < cache.chunk_size:
+                self.eof_chunk = chunk_index
+        return None
+    
+    def run(self):
+        while True:
+            with self.condition:
+                chunk_index = self.next_missing_chunk()
+                while not self.stopped and chunk_index is None:
+                    self.condition.wait()
+                    chunk_index = self.next_missing_chunk()
+                if self.stopped:
+                    return
+            
+            try:
+                chunk = self.fuse_system.load_chunk(self.handle, chunk_index, prefetch=True)
+            except Exception as e:
+                print(f"Prefetch stopped for {self.video_id}: {e}")
+                # Give the slot back so the next sequential read can start a new prefetcher
+                self.fuse_system.prefetcher_exited(self)
+                return
+            
+            if len(chunk) < self.fuse_system.chunk_cache.chunk_size:
+                self.eof_chunk = chunk_index
+
+class FileHandle:
+    """Per-open state: resolved video, stream URL, response cursor and prefetcher"""
+    def __init__(self, fh, path, video):
+        self.fh = fh
+        self.path = path
+        self.video = video
+        self.stream_url = None  # Resolved lazily on the first read
+        self.response = None  # Open HTTP response positioned at response_offset
+        self.response_iter = None
+        self.response_buffer = b''  # Bytes pulled from response_iter but not used yet
+        self.response_offset = None
+        self.lock = threading.Lock()  # Serializes use of the response
+        self.tracker = None
+        self.prefetcher = None
+        self.local_fd = None  # Open offline copy, served with os.pread
+        self.segment_fd = None  # Open segment cache file for this video
+        self.segment_generation = None  # Which incarnation of that file segment_fd points at
+        self.fd_lock = threading.Lock()  # Guards the fds; never held across network I/O
+    
+    def close(self):
+        """Stop background work and return pooled resources"""
+        if self.prefetcher:
+            self.prefetcher.stop()
+            self.prefetcher = None
+        with self.lock:
+            self.close_response()
+        with self.fd_lock:
+            if self.local_fd is not None:
+                os.close(self.local_fd)
+                self.local_fd = None
+            self.close_segment()
+    
+    def close_segment(self):
+        """Close the segment cache fd (fd_lock held)"""
+        if self.segment_fd is not None:
+            os.close(self.segment_fd)
+            self.segment_fd = None
+            self.segment_generation = None
+    
+    def close_response(self):
+        """Drop the open HTTP response (next read reopens at its offset)"""
+        if self.response is not None:
+            self.response.close()
+        self.response = None
+        self.response_iter = None
+        self.response_buffer = b''
+        self.response_offset = None
 
 class YouTubeAPIFUSE(Operations):
     def __init__(self, config_file='youtube_config.json'):
         self.config_file = config_file
         self.config = self.load_config()
         self.youtube_service = None
-        self.playlists = {}  # Cache playlist metadata {playlist_id: {title, sanitized_name, videos}}
+        # Playlist metadata {playlist_id: {title, sanitized_name, videos}} plus path
+        # index, published as one snapshot so lock-free readers see a consistent view
+        self.snapshot = MetadataSnapshot({}, {}, {}, set())
         self.videos = {}  # Cache video metadata by playlist (DEPRECATED - now in playlists)
-        self.stream_cache = {}  # Cache stream URLs temporarily
         self.cache_lock = threading.Lock()
+        self.cache_dir = self.config.get('cache_dir', 'cache')  # Persistent local state
+        
+        # Resolved stream URLs survive restarts and live until their real expiry
+        filesystem_config = self.config.get('filesystem', {})
+        self.stream_urls = StreamUrlCache(
+            os.path.join(self.cache_dir, 'stream_urls.json'),
+            max_entries=filesystem_config.get('stream_url_cache_size', 500)
+        )
+        try:
+            restored = self.stream_urls.load()
+            if restored:
+                print(f"💾 Restored {restored} unexpired stream URLs")
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable stream URL cache: {e}")
+        self.stream_refresh_margin = filesystem_config.get('stream_url_refresh_margin', 900)
+        self.stream_refresh_thread = None
+        self.stream_refresh_stop = threading.Event()  # Also stops the readdir pre-resolver
+        self.stream_resolutions = 0  # yt-dlp extractions (the expensive part of an open)
+        self.stream_flights = SingleFlight()  # Concurrent opens of one video share a lookup
+        
+        # Resolve likely picks in the background after a playlist is listed
+        self.preresolve_count = filesystem_config.get('preresolve_count', 0)
+        self.preresolve_queue = queue.Queue(maxsize=64)
+        self.preresolve_pending = set()  # Video IDs queued, so repeated listings don't pile up
+        self.preresolve_lock = threading.Lock()
+        self.preresolve_thread = None
+        self.preresolved = 0
+        
+        # Warm yt-dlp instances: extractors and player JS are loaded once, not per open
+        self.extractor_pool = ExtractorPool({
+            'quiet': True,
+            'no_warnings': True,
+            'format': self.config['video_quality'],
+            'cachedir': os.path.join(self.cache_dir, 'yt-dlp'),
+        }, size=filesystem_config.get('extractor_pool_size', 2))
+        self.stream_resolver = StreamResolver(
+            self.extractor_pool,
+            workers=filesystem_config.get('resolver_workers', 2),
+            max_queue=filesystem_config.get('resolver_queue_size', 16),
+            timeout=filesystem_config.get('resolver_timeout', 60)
+        )
+        self.stream_refreshes = 0  # Proactive re-resolutions for open files
+        self.stream_reresolutions = 0  # URLs rejected mid-playback (403/410) and resolved again
         self.last_refresh = 0
         self.refresh_interval = self.config.get('refresh_interval', 1800)
         
+        # Read-ahead chunk cache shared by all open files
+        self.chunk_cache = ChunkCache(
+            chunk_size=int(filesystem_config.get('chunk_size_mb', 8) * 1024 * 1024),
+            max_bytes=int(filesystem_config.get('chunk_cache_mb', 256) * 1024 * 1024)
+        )
+        
+        # Optional on-disk tier so rewatched videos are not downloaded again
+        self.segment_cache = None
+        segment_cache_gb = filesystem_config.get('segment_cache_gb', 0)
+        if segment_cache_gb:
+            self.segment_cache = SegmentCache(
+                filesystem_config.get('segment_cache_dir') or os.path.join(self.cache_dir, 'segments'),
+                chunk_size=self.chunk_cache.chunk_size,
+                max_bytes=int(segment_cache_gb * 1024 * 1024 * 1024)
+            )
+            try:
+                restored = self.segment_cache.load()
+                print(f"💽 Segment cache has {restored} videos "
+                      f"({self.segment_cache.current_bytes / (1024 * 1024):.0f}MB)")
+            except Exception as e:
+                print(f"⚠️ Disabling segment cache: {e}")
+                self.segment_cache = None
+        
+        # Pinned playlists mirrored to local disk for zero-latency playback
+        self.offline_mirror = None
+        if self.config.get('playlists', {}).get('offline_playlists'):
+            self.offline_mirror = OfflineMirror(
+                filesystem_config.get('offline_dir') or os.path.join(self.cache_dir, 'offline'),
+                {
+                    'quiet': True,
+                    'no_warnings': True,
+                    'noprogress': True,
+                    'format': self.config['video_quality'],
+                    'continuedl': True,  # Resume .part files after a restart
+                    'ratelimit': int(filesystem_config.get('offline_rate_limit_kbps', 4096) * 1024),
+                    'cachedir': os.path.join(self.cache_dir, 'yt-dlp'),
+                },
+                max_bytes=int(filesystem_config.get('offline_budget_gb', 20) * 1024 * 1024 * 1024),
+                on_complete=self.record_probed_size
+            )
+            try:
+                self.offline_mirror.load()
+            except Exception as e:
+                print(f"⚠️ Disabling offline mirror: {e}")
+                self.offline_mirror = None
+        
+        # Open file handles {fh: FileHandle}, numbered monotonically
+        self.handles = {}
+        self.next_fh = 1
+        self.handle_lock = threading.Lock()
+        
+        # Sequential access detection and background prefetch per open file
+        self.active_prefetchers = 0
+        self.prefetch_lock = threading.Lock()
+        self.chunk_fetches = {}  # {(video_id, chunk_index): Event} for downloads in progress
+        self.chunk_fetch_lock = threading.Lock()
+        self.prefetched_chunks = 0
+        self.negative_hits = 0  # getattr misses answered from the snapshot's miss cache
+        self.local_reads = 0  # Reads answered with pread from the segment cache or offline store
+        self.local_read_bytes = 0
+        
+        # Keep-alive HTTP connection pool shared by all open files
+        self.http_session = None
+        self.http_last_used = 0
+        self.http_sessions_created = 0
+        self.http_requests = 0
+        self.streams_opened = 0  # Streaming responses opened (first read or seek)
+        self.stream_reuses = 0  # Chunks served from an already open response
+        self.http_lock = threading.Lock()
+        
+        # Bound concurrent upstream downloads when FUSE runs multithreaded
+        self.max_inflight_fetches = filesystem_config.get('max_inflight_fetches', 8)
+        self.fetch_semaphore = threading.BoundedSemaphore(self.max_inflight_fetches)
+        self.inflight_fetches = 0
+        self.inflight_lock = threading.Lock()  # A gauge - unlocked += from threads would drift
+        
+        self.stats_file = self.config.get('stats_file', 'fuse_stats.json')
+        self.last_stats_write = 0
+        self.stats_lock = threading.Lock()
+        
         # Change detection for quota optimization
         self.playlist_etags = {}  # Store ETags for change detection
         self.playlist_modified_times = {}  # Track when playlists were last modified
@@ -38,7 +1244,15 @@ class YouTubeAPIFUSE(Operations):
         # Quota management initialization
         self.quota_usage = 0
         self.api_call_count = 0
-        self.last_api_call = 0
+        self.quota_lock = threading.Lock()
+        self.api_failures = 0  # API calls that raised (lets the scheduler back off)
+        self.rate_limiters = {}  # {endpoint: TokenBucket}
+        self.rate_limiters_lock = threading.Lock()
+        self.api_scheduler = ApiCallScheduler()
+        self.priority_calls = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.priority_skipped = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.playlist_fetch_times = {}  # {playlist_id: seconds taken by its last fetch}
+        self.playlist_flights = SingleFlight()  # Duplicate fetches of one playlist share a result
         self.quota_reset_time = time.time() + 86400  # Default to 24 hours from now
         
         # Now set the proper quota reset time
@@ -49,11 +1263,46 @@ class YouTubeAPIFUSE(Operations):
             # Fall back to midnight today
             self.quota_reset_time = time.time() + (86400 - (time.time() % 86400))
         
+        # Durable quota accounting so restarts don't reset the counter to zero
+        quota_config = self.config.get('quota_management', {})
+        self.quota_ledger = QuotaLedger(
+            os.path.join(self.cache_dir, 'quota_ledger.jsonl'),
+            fsync_batch=quota_config.get('ledger_fsync_batch', 10)
+        )
+        try:
+            self.quota_usage, self.api_call_count = self.quota_ledger.load(self.get_quota_day())
+            if self.quota_usage:
+                print(f"📒 Restored quota usage for {self.get_quota_day()}: "
+                      f"{self.quota_usage} units ({self.api_call_count} calls)")
+        except Exception as e:
+            print(f"Warning: Could not read quota ledger: {e}")
+        
         self.authenticate()
         
         # Initialize empty state so FUSE mount can start immediately
-        self.playlists = {}
         self.refresh_thread = None  # Will be started after mount
+        self.refresh_stop = threading.Event()
+        self.next_refresh_time = None  # When the scheduler runs next
+        self.last_refresh_duration = None  # Seconds taken by the last scheduled run
+        self.last_refresh_type = None  # 'full' or 'incremental'
+        self.last_full_refresh = 0
+        self.refresh_failures = 0  # Consecutive runs that failed or hit low quota
+        
+        # Serve the last known tree right away and reconcile in the background
+        self.metadata_file = os.path.join(self.cache_dir, 'metadata.json')
+        # Per-video durations and probed sizes {video_id: {title, duration, size}}
+        self.enrichment = {}
+        self.enrichment_lock = threading.Lock()
+        self.enrichment_file = os.path.join(self.cache_dir, 'enrichment.json')
+        self.enrichment_calls = 0
+        self.size_probes = 0
+        self.load_enrichment_cache()
+        self.load_metadata_cache()
+        
+        # Local copies are the true size of their files
+        if self.offline_mirror:
+            for video_id, size in self.offline_mirror.downloaded().items():
+                self.record_probed_size(video_id, size)
     
     def load_config(self):
         """Load configuration from JSON file and environment variables"""
@@ -67,25 +1316,67 @@ class YouTubeAPIFUSE(Operations):
                 "custom_playlists": [],  # List of playlist IDs
                 "enabled_playlists": [],  # Specific playlist IDs to enable (empty = all)
                 "max_playlists": 10,  # Maximum number of playlists to fetch
-                "max_videos_per_playlist": 50  # Maximum videos per playlist
+                "max_videos_per_playlist": 50,  # Maximum videos per playlist
+                "enrich_metadata": True,  # Fetch durations with batched videos.list calls
+                "offline_playlists": []  # Playlist IDs ("watch_later" for Watch Later) mirrored to disk
             },
             "quota_management": {
                 "enabled": True,  # Enable quota management features
                 "daily_quota_limit": 10000,  # Conservative daily quota limit
-                "rate_limit_delay": 1.0,  # Seconds between API calls
+                "rate_limit_delay": 1.0,  # Seconds between API calls (sustained rate)
+                "rate_limit_burst": 5,  # API calls allowed back-to-back before rate limiting
+                "reserved_quota_fraction": 0.2,  # Share of daily quota kept for user-visible playlists
                 "quota_reset_hour": 0,  # Hour when quota resets (0-23, PST)
                 "emergency_mode": False,  # Disable all API calls if quota exceeded
                 "cache_duration": 3600,  # How long to cache data (seconds)
                 "use_incremental_refresh": True,  # Use change detection to save quota
-                "playlist_check_interval": 3600  # Check for playlist changes every hour
+                "playlist_check_interval": 3600,  # Check for playlist changes every hour
+                "ledger_fsync_batch": 10,  # fsync the quota ledger every N API calls
+                "max_parallel_fetches": 4  # Playlists fetched concurrently during a refresh
             },
             "filesystem": {
                 "uid": 121,  # mythtv user ID
                 "gid": 130,  # mythtv group ID
                 "dir_mode": 0o2775,  # rwxrwsr-x with setgid bit
-                "file_mode": 0o664   # rw-rw-r--
+                "file_mode": 0o664,  # rw-rw-r--
+                "chunk_size_mb": 8,  # Size of aligned blocks fetched from the stream
+                "chunk_cache_mb": 256,  # Memory budget for cached chunks (all files)
+                "prefetch_window_mb": 32,  # How far ahead of a sequential reader to prefetch
+                "max_prefetchers": 4,  # Maximum files prefetching at the same time
+                "sequential_threshold": 3,  # Contiguous reads before prefetching starts
+                "multithreaded": False,  # Serve FUSE requests from multiple threads
+                "max_inflight_fetches": 8,  # Concurrent upstream downloads (all files)
+                "estimated_bitrate_kbps": 2500,  # Size estimate from duration until the real size is probed
+                "stream_url_cache_size": 500,  # Resolved stream URLs kept (persisted in cache_dir)
+                "stream_url_refresh_margin": 900,  # Re-resolve URLs of open files this long before expiry
+                "extractor_pool_size": 2,  # Reusable yt-dlp instances (concurrent extractions)
+                "resolver_workers": 2,  # Processes resolving stream URLs (0 = resolve in-process)
+                "resolver_queue_size": 16,  # Extra lookups allowed to wait for a worker
+                "resolver_timeout": 60,  # Seconds an open waits for a stream URL before failing
+                "preresolve_count": 0,  # Newest videos to resolve in the background after readdir (0 = off)
+                "segment_cache_gb": 0,  # Disk budget for downloaded chunks (0 = memory cache only)
+                "segment_cache_dir": "",  # Where cached chunks live (default: cache_dir/segments)
+                "offline_dir": "",  # Where offline playlists are stored (default: cache_dir/offline)
+                "offline_budget_gb": 20,  # Disk budget for offline playlists
+                "offline_rate_limit_kbps": 4096,  # Download speed cap for offline copies
+                "negative_timeout": 30,  # Seconds the kernel caches "no such file" answers
+                "entry_timeout": 1,  # Seconds the kernel caches name lookups
+                "attr_timeout": 1  # Seconds the kernel caches file attributes
             },
+            "http": {
+                "pool_connections": 4,  # Number of hosts to keep connection pools for
+                "pool_size": 8,  # Keep-alive connections per host
+                "idle_timeout": 60,  # Drop pooled connections after this many idle seconds
+                "max_retries": 3,  # Retries for connection errors and 5xx responses
+                "retry_backoff": 0.5,  # Exponential backoff factor between retries
+                "timeout": 30  # Per-request timeout (seconds)
+            },
+            "cache_dir": "cache",  # Persistent metadata and caches survive restarts here
+            "stats_file": "fuse_stats.json",  # Runtime statistics for the dashboard
             "refresh_interval": 1800,  # 30 minutes (increased from 5)
+            "full_refresh_interval": 21600,  # Full refresh every 6 hours, incremental in between
+            "refresh_jitter": 0.1,  # Randomize refresh intervals by +/-10%
+            "refresh_max_backoff": 14400,  # Longest delay after failures or low quota (seconds)
             "video_quality": "best[ext=mp4]/best"
         }
         
@@ -200,7 +1491,26 @@ class YouTubeAPIFUSE(Operations):
         
         return next_reset.timestamp()
     
-    def check_quota_limit(self, required_quota=1):
+    def get_quota_day(self):
+        """Pacific-time date of the quota day that ends at quota_reset_time"""
+        pst = pytz.timezone('US/Pacific')
+        # Step back a calendar day, not 86400s - DST days are 23 or 25 hours long
+        reset = datetime.fromtimestamp(self.quota_reset_time, pst)
+        return (reset - timedelta(days=1)).strftime('%Y-%m-%d')
+    
+    def get_quota_allowance(self, priority):
+        """Daily quota a priority class may use; the rest is reserved for higher priorities"""
+        quota_config = self.config.get('quota_management', {})
+        daily_limit = quota_config.get('daily_quota_limit', 10000)
+        reserved = daily_limit * quota_config.get('reserved_quota_fraction', 0.2)
+        
+        if priority == PRIORITY_BULK:
+            return daily_limit - reserved
+        if priority == PRIORITY_CHANGE_DETECTION:
+            return daily_limit - reserved / 2
+        return daily_limit
+    
+    def check_quota_limit(self, required_quota=1, priority=PRIORITY_INTERACTIVE):
         """Check if we can make an API call without exceeding quota"""
         quota_config = self.config.get('quota_management', {})
         
@@ -209,11 +1519,12 @@ class YouTubeAPIFUSE(Operations):
         
         # Reset quota usage if we've passed the reset time
         current_time = time.time()
-        if current_time >= self.quota_reset_time:
-            self.quota_usage = 0
-            self.api_call_count = 0
-            self.quota_reset_time = self.get_next_quota_reset()
-            print(f"🔄 Quota reset! New reset time: {datetime.fromtimestamp(self.quota_reset_time)}")
+        with self.quota_lock:
+            if current_time >= self.quota_reset_time:
+                self.quota_usage = 0
+                self.api_call_count = 0
+                self.quota_reset_time = self.get_next_quota_reset()
+                print(f"🔄 Quota reset! New reset time: {datetime.fromtimestamp(self.quota_reset_time)}")
         
         # Check if we're in emergency mode
         if quota_config.get('emergency_mode', False):
@@ -226,28 +1537,43 @@ class YouTubeAPIFUSE(Operations):
             print(f"⚠️ Quota limit reached: {self.quota_usage}/{daily_limit}")
             return False
         
+        # Keep part of the remaining quota for higher-priority work
+        allowance = self.get_quota_allowance(priority)
+        if self.quota_usage + required_quota > allowance:
+            print(f"⚠️ Quota reserved for higher-priority calls: {self.quota_usage}/{allowance:.0f} "
+                  f"available to {PRIORITY_NAMES[priority]} calls")
+            return False
+        
         return True
     
-    def rate_limit_api_call(self):
-        """Implement rate limiting between API calls"""
-        quota_config = self.config.get('quota_management', {})
-        rate_limit = quota_config.get('rate_limit_delay', 1.0)
-        
-        if rate_limit > 0:
-            current_time = time.time()
-            time_since_last_call = current_time - self.last_api_call
-            
-            if time_since_last_call < rate_limit:
-                sleep_time = rate_limit - time_since_last_call
-                print(f"⏱️ Rate limiting: sleeping {sleep_time:.2f}s")
-                time.sleep(sleep_time)
-        
-        self.last_api_call = time.time()
+    def get_rate_limiter(self, endpoint):
+        """Return the token bucket for an API endpoint, creating it on first use"""
+        with self.rate_limiters_lock:
+            if endpoint not in self.rate_limiters:
+                quota_config = self.config.get('quota_management', {})
+                # Per-endpoint overrides, e.g. {"playlistItems": {"rate_limit_burst": 10}}
+                endpoint_config = dict(quota_config)
+                endpoint_config.update(quota_config.get('rate_limit_endpoints', {}).get(endpoint, {}))
+                self.rate_limiters[endpoint] = TokenBucket.from_config(endpoint_config)
+            return self.rate_limiters[endpoint]
+    
+    def rate_limit_api_call(self, endpoint='default'):
+        """Wait for a token from the endpoint's rate limiter"""
+        waited = self.get_rate_limiter(endpoint).acquire()
+        if waited > 0:
+            print(f"⏱️ Rate limiting {endpoint}: waited {waited:.2f}s")
     
     def track_quota_usage(self, operation_type, quota_cost=1):
-        """Track quota usage for monitoring"""
-        self.quota_usage += quota_cost
-        self.api_call_count += 1
+        """Track quota usage for monitoring and record it in the ledger"""
+        with self.quota_lock:
+            self.quota_usage += quota_cost
+            self.api_call_count += 1
+            quota_day = self.get_quota_day()
+        
+        try:
+            self.quota_ledger.record(quota_day, operation_type, quota_cost)
+        except Exception as e:
+            print(f"Warning: Could not write quota ledger: {e}")
         
         quota_config = self.config.get('quota_management', {})
         daily_limit = quota_config.get('daily_quota_limit', 10000)
@@ -259,23 +1585,41 @@ class YouTubeAPIFUSE(Operations):
         if self.quota_usage > daily_limit * 0.8:
             print(f"⚠️ Warning: Using {(self.quota_usage/daily_limit)*100:.1f}% of daily quota")
     
-    def make_api_call(self, operation_type, api_call_func, quota_cost=1):
-        """Wrapper for YouTube API calls with quota management"""
-        if not self.check_quota_limit(quota_cost):
+    def make_api_call(self, operation_type, api_call_func, quota_cost=1, endpoint='default',
+                      priority=PRIORITY_BULK):
+        """Wrapper for YouTube API calls with quota management and priority scheduling"""
+        priority_name = PRIORITY_NAMES[priority]
+        if not self.check_quota_limit(quota_cost, priority):
             print(f"❌ Skipping {operation_type} - quota limit reached")
+            self.priority_skipped[priority_name] += 1
             return None
         
         try:
-            self.rate_limit_api_call()
+            # Higher-priority calls waiting on the same endpoint get their token first
+            self.api_scheduler.acquire(endpoint, priority)
+            try:
+                self.rate_limit_api_call(endpoint)
+            finally:
+                self.api_scheduler.release(endpoint)
+            self.priority_calls[priority_name] += 1
             result = api_call_func()
             self.track_quota_usage(operation_type, quota_cost)
             return result
         except Exception as e:
             print(f"❌ API call failed for {operation_type}: {e}")
+            self.api_failures += 1
             # Still count the quota usage even on failure
             self.track_quota_usage(f"{operation_type} (failed)", quota_cost)
             return None
     
+    def get_playlist_priority(self, playlist_id):
+        """Configured playlists are user-visible; auto-discovered ones are bulk work"""
+        if playlist_id in ('watch_later', 'WL'):
+            return PRIORITY_INTERACTIVE
+        if playlist_id in self.config.get('playlists', {}).get('custom_playlists', []):
+            return PRIORITY_INTERACTIVE
+        return PRIORITY_BULK
+    
     def get_user_playlists(self):
         """Auto-discover all user playlists with quota management"""
         if not self.config['use_oauth']:
@@ -300,7 +1644,7 @@ class YouTubeAPIFUSE(Operations):
                         pageToken=next_page_token
                     ).execute()
 
-                response = self.make_api_call("get_user_playlists", api_call, quota_cost=1)
+                response = self.make_api_call("get_user_playlists", api_call, quota_cost=1, endpoint='playlists')
                 if not response:
                     break
 
@@ -334,37 +1678,38 @@ class YouTubeAPIFUSE(Operations):
         return playlists
 
     def get_watch_later_playlist(self):
-        """Get Watch Later playlist items"""
+        """Get Watch Later playlist items (raises if they cannot be fetched)"""
         if not self.config['use_oauth']:
             print("Watch Later requires OAuth authentication")
             return []
         
-        try:
-            # Get the user's playlists to find Watch Later
-            playlists_response = self.youtube_service.playlists().list(
-                part='snippet',
-                mine=True,
-                maxResults=50
-            ).execute()
-            
-            watch_later_id = None
-            for playlist in playlists_response['items']:
-                if playlist['snippet']['title'] == 'Watch Later':
-                    watch_later_id = playlist['id']
-                    break
-            
-            if not watch_later_id:
-                # Try the standard Watch Later playlist ID
-                watch_later_id = 'WL'
-            
-            return self.get_playlist_videos(watch_later_id)
-            
-        except Exception as e:
-            print(f"Error fetching Watch Later: {e}")
-            return []
+        # Get the user's playlists to find Watch Later
+        playlists_response = self.youtube_service.playlists().list(
+            part='snippet',
+            mine=True,
+            maxResults=50
+        ).execute()
+        
+        watch_later_id = None
+        for playlist in playlists_response['items']:
+            if playlist['snippet']['title'] == 'Watch Later':
+                watch_later_id = playlist['id']
+                break
+        
+        if not watch_later_id:
+            # Try the standard Watch Later playlist ID
+            watch_later_id = 'WL'
+        
+        return self.get_playlist_videos(watch_later_id, priority=PRIORITY_INTERACTIVE)
     
-    def get_playlist_videos(self, playlist_id):
-        """Get videos from a specific playlist with quota management"""
+    def get_playlist_videos(self, playlist_id, priority=None):
+        """Get videos from a specific playlist, sharing any fetch of it already in progress"""
+        return self.playlist_flights.do(playlist_id, lambda: self.fetch_playlist_videos(playlist_id, priority))
+    
+    def fetch_playlist_videos(self, playlist_id, priority=None):
+        """Get videos from a specific playlist with quota management; raises on a failed page"""
+        if priority is None:
+            priority = self.get_playlist_priority(playlist_id)
         playlist_config = self.config.get('playlists', {})
         max_videos = playlist_config.get('max_videos_per_playlist', 50)
         
@@ -372,66 +1717,63 @@ class YouTubeAPIFUSE(Operations):
         next_page_token = None
         fetched_count = 0
         
-        try:
-            while True:
-                def api_call():
-                    return self.youtube_service.playlistItems().list(
-                        part='snippet',
-                        playlistId=playlist_id,
-                        maxResults=min(50, max_videos - fetched_count),
-                        pageToken=next_page_token
-                    ).execute()
+        while True:
+            def api_call():
+                return self.youtube_service.playlistItems().list(
+                    part='snippet',
+                    playlistId=playlist_id,
+                    maxResults=min(50, max_videos - fetched_count),
+                    pageToken=next_page_token
+                ).execute()
 
-                response = self.make_api_call(f"get_playlist_videos({playlist_id})", api_call, quota_cost=1)
-                if not response:
-                    break
+            response = self.make_api_call(f"get_playlist_videos({playlist_id})", api_call, quota_cost=1,
+                                          endpoint='playlistItems', priority=priority)
+            if response is None:
+                # Failed or skipped for quota - a partial list must not replace the real one
+                raise RuntimeError(f"playlist {playlist_id} could not be fetched")
 
-                for item in response['items']:
-                    if item['snippet']['resourceId']['kind'] == 'youtube#video':
-                        video_id = item['snippet']['resourceId']['videoId']
-                        title = item['snippet']['title']
+            for item in response['items']:
+                if item['snippet']['resourceId']['kind'] == 'youtube#video':
+                    video_id = item['snippet']['resourceId']['videoId']
+                    title = item['snippet']['title']
+                    
+                    # Skip deleted/private videos
+                    if title != 'Deleted video' and title != 'Private video':
+                        videos.append({
+                            'id': video_id,
+                            'title': title,
+                            'url': f'https://youtube.com/watch?v={video_id}',
+                            'publishedAt': item['snippet'].get('publishedAt')
+                        })
                         
-                        # Skip deleted/private videos
-                        if title != 'Deleted video' and title != 'Private video':
-                            videos.append({
-                                'id': video_id,
-                                'title': title,
-                                'url': f'https://youtube.com/watch?v={video_id}',
-                                'publishedAt': item['snippet'].get('publishedAt')
-                            })
-                            
-                            fetched_count += 1
-                            if fetched_count >= max_videos:
-                                print(f"🛑 Reached max videos limit for playlist {playlist_id}: {max_videos}")
-                                return videos
+                        fetched_count += 1
+                        if fetched_count >= max_videos:
+                            print(f"🛑 Reached max videos limit for playlist {playlist_id}: {max_videos}")
+                            return videos
 
-                next_page_token = response.get('nextPageToken')
-                if not next_page_token:
-                    break
-                    
-        except Exception as e:
-            print(f"Error fetching playlist {playlist_id}: {e}")
+            next_page_token = response.get('nextPageToken')
+            if not next_page_token:
+                break
         
         print(f"📺 Fetched {len(videos)} videos from playlist {playlist_id} (max: {max_videos})")
         return videos
 
-    def refresh_videos(self, force_full_refresh=False):
+    def refresh_videos(self, force_full_refresh=False, check_interval=True):
         """Fetch all configured playlists and build video cache with quota management"""
         # Use incremental refresh by default to save quota
         use_incremental = self.config.get('quota_management', {}).get('use_incremental_refresh', True)
         
         if use_incremental and not force_full_refresh:
-            return self.refresh_videos_incremental()
+            return self.refresh_videos_incremental(check_interval=check_interval)
         
         # Full refresh (original method)
         current_time = time.time()
         quota_config = self.config.get('quota_management', {})
-        cache_duration = quota_config.get('cache_duration', 3600)
         
         # Use cache duration from quota config if available
-        effective_refresh_interval = min(self.refresh_interval, cache_duration)
+        effective_refresh_interval = self.get_effective_refresh_interval()
         
-        if current_time - self.last_refresh < effective_refresh_interval:
+        if check_interval and current_time - self.last_refresh < effective_refresh_interval:
             return  # Too soon to refresh
 
         # Check if we're in emergency mode
@@ -442,8 +1784,8 @@ class YouTubeAPIFUSE(Operations):
         print("🔄 Full refresh of videos from YouTube API...")
         print(f"📊 Current quota usage: {self.quota_usage}/{quota_config.get('daily_quota_limit', 10000)}")
         
-        new_playlists = {}
         playlist_config = self.config.get('playlists', {})
+        playlist_jobs = {}  # {playlist_id: fetch function}, in directory order
 
         # Auto-discover user playlists if enabled
         if playlist_config.get('auto_discover', False):
@@ -451,97 +1793,392 @@ class YouTubeAPIFUSE(Operations):
             user_playlists = self.get_user_playlists()
             
             for playlist in user_playlists:
-                playlist_id = playlist['id']
-                playlist_title = playlist['title']
-                sanitized_name = self.sanitize_filename(playlist_title)
-                
-                print(f"📋 Fetching auto-discovered playlist: {playlist_title}")
-                playlist_videos = self.get_playlist_videos(playlist_id)
+                playlist_jobs[playlist['id']] = lambda playlist=playlist: self.fetch_discovered_playlist(playlist)
+
+        # Get Watch Later if configured
+        if playlist_config.get('watch_later', True):
+            playlist_jobs['watch_later'] = self.fetch_watch_later
+
+        # Get custom playlists
+        custom_playlists = playlist_config.get('custom_playlists', [])
+        enabled_playlists = playlist_config.get('enabled_playlists', [])
+        
+        for playlist_id in custom_playlists:
+            # Skip if enabled_playlists is specified and this isn't in it
+            if enabled_playlists and playlist_id not in enabled_playlists:
+                print(f"⏭️ Skipping disabled playlist: {playlist_id}")
+                continue
+            
+            playlist_jobs[playlist_id] = lambda playlist_id=playlist_id: self.fetch_custom_playlist(playlist_id)
+
+        new_playlists = self.fetch_playlists_concurrently(playlist_jobs)
+
+        # Update playlist cache
+        self.publish_playlists(new_playlists)
+        self.last_refresh = current_time
+
+        total_videos = sum(len(playlist['videos']) for playlist in new_playlists.values())
+        print(f"✅ Loaded {len(new_playlists)} playlists with {total_videos} total videos")
+        print(f"📊 Final quota usage: {self.quota_usage}/{quota_config.get('daily_quota_limit', 10000)}")
+    
+    def fetch_playlists_concurrently(self, playlist_jobs):
+        """Run playlist fetch jobs on a bounded worker pool and build playlist entries"""
+        max_workers = self.config.get('quota_management', {}).get('max_parallel_fetches', 4)
+        
+        def timed_fetch(playlist_id, fetch):
+            started = time.time()
+            try:
+                return fetch()
+            finally:
+                self.playlist_fetch_times[playlist_id] = time.time() - started
+        
+        new_playlists = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            # Start user-visible playlists first so bulk work cannot delay them
+            futures = {}
+            for playlist_id in sorted(playlist_jobs, key=self.get_playlist_priority):
+                futures[playlist_id] = pool.submit(timed_fetch, playlist_id, playlist_jobs[playlist_id])
+            futures = {playlist_id: futures[playlist_id] for playlist_id in playlist_jobs}
+            
+            # Collect in submission order so directory order stays stable
+            for playlist_id, future in futures.items():
+                try:
+                    playlist_title, sanitized_name, playlist_videos = future.result()
+                except Exception as e:
+                    print(f"Error fetching playlist {playlist_id}: {e}")
+                    continue
                 
                 new_playlists[playlist_id] = {
                     'title': playlist_title,
                     'sanitized_name': sanitized_name,
                     'videos': {}
                 }
-                
                 for video in playlist_videos:
                     filename = f"{self.sanitize_filename(video['title'])}.mp4"
-                    new_playlists[playlist_id]['videos'][filename] = self.create_video_entry(video)
-
-        # Get Watch Later if configured
-        if playlist_config.get('watch_later', True):
-            print("📺 Fetching Watch Later playlist...")
-            watch_later_videos = self.get_watch_later_playlist()
-            playlist_id = 'watch_later'
-            
-            new_playlists[playlist_id] = {
-                'title': 'Watch Later',
-                'sanitized_name': 'Watch_Later',
-                'videos': {}
-            }
-            
-            for video in watch_later_videos:
-                filename = f"{self.sanitize_filename(video['title'])}.mp4"
-                new_playlists[playlist_id]['videos'][filename] = self.create_video_entry(video)
-
-        # Get custom playlists
-        custom_playlists = playlist_config.get('custom_playlists', [])
-        enabled_playlists = playlist_config.get('enabled_playlists', [])
+                    new_playlists[playlist_id]['videos'][filename] = self.create_video_entry(video)
+                
+                print(f"⏱️ Fetched {playlist_title} in {self.playlist_fetch_times[playlist_id]:.2f}s")
         
-        for playlist_id in custom_playlists:
-            # Skip if enabled_playlists is specified and this isn't in it
-            if enabled_playlists and playlist_id not in enabled_playlists:
-                print(f"⏭️ Skipping disabled playlist: {playlist_id}")
-                continue
+        self.enrich_videos(new_playlists)
+        return new_playlists
+    
+    def enrich_videos(self, playlists):
+        """Fill in durations via videos.list (50 IDs per call) and apply cached enrichment"""
+        entries = [video for playlist in playlists.values() for video in playlist['videos'].values()]
+        
+        if self.config.get('playlists', {}).get('enrich_metadata', True):
+            # Only look up videos that are new or changed since they were last enriched
+            with self.enrichment_lock:
+                stale_ids = list(dict.fromkeys(
+                    video['id'] for video in entries
+                    if self.enrichment.get(video['id'], {}).get('title') != video['title']
+                ))
+            titles = {video['id']: video['title'] for video in entries}
+            
+            for start in range(0, len(stale_ids), 50):
+                batch = stale_ids[start:start + 50]
+                
+                def api_call(batch=batch):
+                    return self.youtube_service.videos().list(
+                        part='contentDetails',
+                        id=','.join(batch),
+                        maxResults=50
+                    ).execute()
+                
+                response = self.make_api_call(f"enrich_videos({len(batch)})", api_call, quota_cost=1,
+                                              endpoint='videos')
+                if not response:
+                    break
+                self.enrichment_calls += 1
                 
-            print(f"📋 Fetching custom playlist {playlist_id}...")
+                with self.enrichment_lock:
+                    for item in response.get('items', []):
+                        details = self.enrichment.setdefault(item['id'], {})
+                        # Keep sizes probed before the first lookup - only a changed title drops one
+                        if 'title' in details and details['title'] != titles.get(item['id']):
+                            details.pop('size', None)  # Video changed - probe its size again
+                        details['title'] = titles.get(item['id'])
+                        details['duration'] = parse_iso8601_duration(
+                            item.get('contentDetails', {}).get('duration'))
             
-            # Get playlist metadata first
-            def get_metadata():
-                return self.youtube_service.playlists().list(
-                    part='snippet',
-                    id=playlist_id
-                ).execute()
+            if stale_ids:
+                print(f"🏷️ Enriched {len(stale_ids)} videos with durations")
+        
+        for video in entries:
+            self.apply_enrichment(video)
+    
+    def apply_enrichment(self, video):
+        """Set duration and the best known size on a video entry"""
+        with self.enrichment_lock:
+            details = dict(self.enrichment.get(video['id'], {}))
+        
+        if details.get('duration'):
+            video['duration'] = details['duration']
+        if details.get('size'):
+            video['size'] = details['size']
+        elif details.get('duration'):
+            bitrate = self.config.get('filesystem', {}).get('estimated_bitrate_kbps', 2500)
+            video['size'] = int(details['duration'] * bitrate * 1000 / 8)
+    
+    def record_probed_size(self, video_id, size, duration=None):
+        """Remember the real size of the selected format and update st_size in place"""
+        if not size:
+            return
+        size = int(size)
+        
+        # An offline copy is what read() serves, so its size wins over stream probes
+        if self.offline_mirror:
+            size = self.offline_mirror.size(video_id) or size
+        
+        with self.enrichment_lock:
+            details = self.enrichment.setdefault(video_id, {})
+            if details.get('size') == size:
+                return
+            details['size'] = size
+            if duration and not details.get('duration'):
+                details['duration'] = int(duration)
+            self.size_probes += 1
+        
+        # Entries are shared with open handles, so they see the new size immediately
+        with self.cache_lock:
+            for playlist in self.snapshot.playlists.values():
+                for video in playlist['videos'].values():
+                    if video['id'] == video_id:
+                        video['size'] = size
+    
+    def load_enrichment_cache(self):
+        """Restore per-video enrichment saved by a previous run"""
+        try:
+            with open(self.enrichment_file, 'r') as f:
+                self.enrichment = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable enrichment cache {self.enrichment_file}: {e}")
+            return
+        
+        print(f"💾 Loaded enrichment for {len(self.enrichment)} videos from {self.enrichment_file}")
+    
+    def save_enrichment_cache(self):
+        """Persist per-video enrichment so unchanged videos are never looked up again"""
+        with self.enrichment_lock:
+            enrichment = dict(self.enrichment)
+        
+        try:
+            write_json_atomic(self.enrichment_file, enrichment)
+        except Exception as e:
+            print(f"Error saving enrichment cache {self.enrichment_file}: {e}")
+    
+    def fetch_discovered_playlist(self, playlist):
+        """Fetch job for an auto-discovered playlist"""
+        print(f"📋 Fetching auto-discovered playlist: {playlist['title']}")
+        return playlist['title'], self.sanitize_filename(playlist['title']), self.get_playlist_videos(playlist['id'])
+    
+    def fetch_watch_later(self):
+        """Fetch job for the Watch Later playlist"""
+        print("📺 Fetching Watch Later playlist...")
+        return 'Watch Later', 'Watch_Later', self.get_watch_later_playlist()
+    
+    def fetch_custom_playlist(self, playlist_id, existing=None):
+        """Fetch job for a configured playlist, reusing a known title if we have one"""
+        print(f"📋 Fetching playlist {playlist_id}...")
+        if existing:
+            playlist_title = existing['title']
+            sanitized_name = existing['sanitized_name']
+        else:
+            playlist_title = self.get_playlist_title(playlist_id)
+            sanitized_name = self.sanitize_filename(playlist_title)
+        return playlist_title, sanitized_name, self.get_playlist_videos(playlist_id)
+    
+    def get_playlist_title(self, playlist_id):
+        """Custom title from the config, or the playlist title from the API"""
+        playlist_config = self.config.get('playlists', {})
+        custom_titles = playlist_config.get('playlist_titles', {})
+        if playlist_id in custom_titles:
+            playlist_title = custom_titles[playlist_id]
+            print(f"📝 Using custom title for {playlist_id}: {playlist_title}")
+            return playlist_title
+        
+        # Get playlist metadata from API
+        def get_metadata():
+            return self.youtube_service.playlists().list(
+                part='snippet',
+                id=playlist_id
+            ).execute()
+        
+        try:
+            playlist_response = self.make_api_call(f"get_playlist_metadata({playlist_id})", get_metadata, quota_cost=1,
+                                                   endpoint='playlists',
+                                                   priority=self.get_playlist_priority(playlist_id))
             
-            # Check for custom playlist title first
-            custom_titles = playlist_config.get('playlist_titles', {})
-            if playlist_id in custom_titles:
-                playlist_title = custom_titles[playlist_id]
-                print(f"📝 Using custom title for {playlist_id}: {playlist_title}")
-            else:
-                # Get playlist metadata from API
-                try:
-                    playlist_response = self.make_api_call(f"get_playlist_metadata({playlist_id})", get_metadata, quota_cost=1)
-                    
-                    if playlist_response and playlist_response['items']:
-                        playlist_title = playlist_response['items'][0]['snippet']['title']
-                    else:
-                        playlist_title = f"Playlist_{playlist_id}"
-                except Exception as e:
-                    print(f"Error getting playlist metadata for {playlist_id}: {e}")
-                    playlist_title = f"Playlist_{playlist_id}"
+            if playlist_response and playlist_response['items']:
+                return playlist_response['items'][0]['snippet']['title']
+        except Exception as e:
+            print(f"Error getting playlist metadata for {playlist_id}: {e}")
+        return f"Playlist_{playlist_id}"
+    
+    def build_path_index(self, playlists):
+        """Build directory and file lookup tables for a playlists dict"""
+        dir_index = {}
+        file_index = {}
+        for playlist_id, playlist_data in playlists.items():
+            dir_name = playlist_data['sanitized_name']
+            if dir_name in dir_index:
+                continue  # First playlist with a given name wins
+            dir_index[dir_name] = playlist_id
+            for filename, video in playlist_data['videos'].items():
+                file_index[f"/{dir_name}/{filename}"] = video
+        return dir_index, file_index
+    
+    @property
+    def playlists(self):
+        """Playlist metadata of the current snapshot (treat as read-only)"""
+        return self.snapshot.playlists
+    
+    def publish_playlists(self, playlists):
+        """Atomically replace the metadata snapshot (copy-on-write)"""
+        dir_index, file_index = self.build_path_index(playlists)
+        with self.cache_lock:
+            # A fresh snapshot starts with no negative entries - new paths may exist now
+            self.snapshot = MetadataSnapshot(playlists, dir_index, file_index, set())
+        
+        if self.offline_mirror:
+            offline_playlists = self.config.get('playlists', {}).get('offline_playlists', [])
+            # Only delete unpinned files when every pinned playlist was loaded with videos -
+            # a failed fetch (left out of playlists) or an empty one must not wipe the store
+            self.offline_mirror.sync([
+                video['id']
+                for playlist_id in offline_playlists if playlist_id in playlists
+                for video in playlists[playlist_id]['videos'].values()
+            ], prune=all(playlists.get(playlist_id, {}).get('videos') for playlist_id in offline_playlists))
+    
+    def find_playlist(self, dir_name, snapshot=None):
+        """Resolve a playlist directory name to its playlist data (or None)"""
+        snapshot = snapshot or self.snapshot
+        playlist_id = snapshot.dir_index.get(dir_name)
+        if playlist_id is None:
+            return None
+        return snapshot.playlists.get(playlist_id)
+    
+    def get_effective_refresh_interval(self):
+        """Refresh interval capped by the quota cache duration"""
+        cache_duration = self.config.get('quota_management', {}).get('cache_duration', 3600)
+        return min(self.refresh_interval, cache_duration)
+    
+    def start_refresh_scheduler(self, force_full_refresh=False):
+        """Start the background thread that owns all playlist refreshes"""
+        self.refresh_stop.clear()
+        self.refresh_thread = threading.Thread(
+            target=self.refresh_loop,
+            args=(force_full_refresh,),
+            daemon=True
+        )
+        self.refresh_thread.start()
+    
+    def stop_refresh_scheduler(self):
+        """Ask the refresh thread to exit after its current run"""
+        self.refresh_stop.set()
+    
+    def refresh_loop(self, force_full_refresh=False):
+        """Run incremental refreshes every interval and full refreshes on a slower cadence"""
+        full_refresh_interval = self.config.get('full_refresh_interval', 21600)
+        
+        if not force_full_refresh and self.last_refresh:
+            # Metadata restored from disk - wait until it is actually due
+            delay = max(0, self.last_refresh + self.get_effective_refresh_interval() - time.time())
+            self.next_refresh_time = time.time() + delay
+            if delay:
+                print(f"💾 Cached metadata is fresh - first refresh at {datetime.fromtimestamp(self.next_refresh_time)}")
+            self.refresh_stop.wait(delay)
+        
+        while not self.refresh_stop.is_set():
+            started = time.time()
+            full_refresh = force_full_refresh or started - self.last_full_refresh >= full_refresh_interval
+            failures_before = self.api_failures
             
-            sanitized_name = self.sanitize_filename(playlist_title)
-            playlist_videos = self.get_playlist_videos(playlist_id)
+            try:
+                self.refresh_videos(force_full_refresh=full_refresh, check_interval=False)
+                succeeded = self.api_failures == failures_before
+            except Exception as e:
+                print(f"❌ Background refresh failed: {e}")
+                succeeded = False
             
-            new_playlists[playlist_id] = {
-                'title': playlist_title,
-                'sanitized_name': sanitized_name,
-                'videos': {}
-            }
+            self.last_refresh_duration = time.time() - started
+            self.last_refresh_type = 'full' if full_refresh else 'incremental'
+            if full_refresh and succeeded:
+                self.last_full_refresh = started
+            force_full_refresh = False  # Only the first run honours --full-refresh
+            self.save_metadata_cache()
             
-            for video in playlist_videos:
-                filename = f"{self.sanitize_filename(video['title'])}.mp4"
-                new_playlists[playlist_id]['videos'][filename] = self.create_video_entry(video)
-
-        # Update playlist cache
-        with self.cache_lock:
-            self.playlists = new_playlists
-            self.last_refresh = current_time
-
-        total_videos = sum(len(playlist['videos']) for playlist in new_playlists.values())
-        print(f"✅ Loaded {len(new_playlists)} playlists with {total_videos} total videos")
-        print(f"📊 Final quota usage: {self.quota_usage}/{quota_config.get('daily_quota_limit', 10000)}")
+            delay = self.get_next_refresh_delay(succeeded)
+            self.next_refresh_time = time.time() + delay
+            print(f"⏰ {self.last_refresh_type.capitalize()} refresh took {self.last_refresh_duration:.1f}s - "
+                  f"next refresh at {datetime.fromtimestamp(self.next_refresh_time)}")
+            self.save_stats(force=True)
+            self.refresh_stop.wait(delay)
+    
+    def load_metadata_cache(self):
+        """Restore playlists, ETags and refresh times saved by a previous run"""
+        try:
+            with open(self.metadata_file, 'r') as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable metadata cache {self.metadata_file}: {e}")
+            return
+        
+        self.playlist_etags = cached.get('playlist_etags', {})
+        self.playlist_modified_times = cached.get('playlist_modified_times', {})
+        self.channel_etag = cached.get('channel_etag')
+        self.last_channel_check = cached.get('last_channel_check', 0)
+        self.last_refresh = cached.get('last_refresh', 0)
+        self.last_full_refresh = cached.get('last_full_refresh', 0)
+        self.publish_playlists(cached.get('playlists', {}))
+        
+        total_videos = sum(len(playlist['videos']) for playlist in self.playlists.values())
+        print(f"💾 Loaded {len(self.playlists)} playlists with {total_videos} videos from {self.metadata_file}")
+    
+    def save_metadata_cache(self):
+        """Persist playlists, ETags and refresh times for instant warm startup"""
+        cached = {
+            'saved_at': time.time(),
+            'playlists': self.playlists,
+            'playlist_etags': self.playlist_etags,
+            'playlist_modified_times': self.playlist_modified_times,
+            'channel_etag': self.channel_etag,
+            'last_channel_check': self.last_channel_check,
+            'last_refresh': self.last_refresh,
+            'last_full_refresh': self.last_full_refresh
+        }
+        
+        try:
+            write_json_atomic(self.metadata_file, cached)
+        except Exception as e:
+            print(f"Error saving metadata cache {self.metadata_file}: {e}")
+        
+        self.save_enrichment_cache()
+    
+    def is_quota_low(self):
+        """True when more than 80% of the daily quota is used"""
+        daily_limit = self.config.get('quota_management', {}).get('daily_quota_limit', 10000)
+        return self.quota_usage > daily_limit * 0.8
+    
+    def get_next_refresh_delay(self, succeeded):
+        """Compute the delay before the next refresh with backoff and jitter"""
+        delay = self.get_effective_refresh_interval()
+        
+        if succeeded and not self.is_quota_low():
+            self.refresh_failures = 0
+        else:
+            # Back off exponentially while the API fails or quota runs low
+            self.refresh_failures += 1
+            max_backoff = self.config.get('refresh_max_backoff', 14400)
+            delay = min(delay * (2 ** self.refresh_failures), max(max_backoff, delay))
+            print(f"⚠️ Backing off refresh ({self.refresh_failures} consecutive failures or low quota)")
+        
+        jitter = self.config.get('refresh_jitter', 0.1)
+        return delay * (1 + random.uniform(-jitter, jitter))
     
     def create_video_entry(self, video_data):
         """Create a video cache entry with YouTube publish date as mtime"""
@@ -556,13 +2193,15 @@ class YouTubeAPIFUSE(Operations):
             except Exception as e:
                 print(f"Error parsing publish date for {video_data['title']}: {e}")
         
-        return {
+        video = {
             'id': video_data['id'],
             'title': video_data['title'],
             'url': video_data['url'],
-            'size': 100 * 1024 * 1024,  # Default 100MB estimate
+            'size': 100 * 1024 * 1024,  # Default 100MB estimate until enriched
             'mtime': mtime,
         }
+        self.apply_enrichment(video)
+        return video
     
     def sanitize_filename(self, title):
         """Convert video title to safe filename"""
@@ -575,56 +2214,115 @@ class YouTubeAPIFUSE(Operations):
             
         return title
     
-    def get_stream_url(self, video_id):
-        """Get fresh stream URL for video (cached for 30 minutes)"""
-        cache_key = video_id
-        current_time = time.time()
-        
-        with self.cache_lock:
-            if cache_key in self.stream_cache:
-                cached_data = self.stream_cache[cache_key]
-                if current_time - cached_data['timestamp'] < 1800:  # 30 minutes
-                    return cached_data['url']
-        
-        # Extract fresh URL using yt-dlp
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'format': self.config['video_quality'],
-        }
-        
+    def get_stream_url(self, video_id, force=False):
+        """Get a stream URL for video, reusing the cached one until shortly before it expires"""
+        if not force:
+            cached = self.stream_urls.get(video_id)
+            if cached:
+                return cached['url']
+        
+        # getattr/open/parallel reads of a new file all land here - extract once
+        return self.stream_flights.do(video_id, lambda: self.resolve_stream_url(video_id, force))
+    
+    def resolve_stream_url(self, video_id, force=False):
+        """Extract a stream URL with yt-dlp and cache it"""
+        if not force:
+            cached = self.stream_urls.peek(video_id)
+            if cached:
+                return cached['url']  # Resolved while we were waiting to start
+        
+        # Extract fresh URL in a resolver process (or a warm in-process yt-dlp instance)
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(f'https://youtube.com/watch?v={video_id}', download=False)
-                
-                stream_url = None
-                if 'formats' in info:
-                    for fmt in info['formats']:
-                        if fmt.get('url') and fmt.get('ext') == 'mp4':
-                            stream_url = fmt['url']
-                            break
-                
-                if not stream_url and info.get('url'):
-                    stream_url = info['url']
+            stream_url, stream_size, duration = self.stream_resolver.resolve(video_id)
+            
+            # Lazy size probe: the selected format knows its real length
+            self.record_probed_size(video_id, stream_size, duration)
+            self.stream_resolutions += 1
+            
+            if stream_url:
+                self.stream_urls.put(video_id, stream_url, stream_size)
+                return stream_url
                 
-                if stream_url:
-                    with self.cache_lock:
-                        self.stream_cache[cache_key] = {
-                            'url': stream_url,
-                            'timestamp': current_time
-                        }
-                    return stream_url
-                    
         except Exception as e:
             print(f"Error extracting stream URL for {video_id}: {e}")
             
         return None
+    
+    def start_stream_refresher(self):
+        """Start the thread that renews stream URLs of open files before they expire"""
+        self.stream_refresh_stop.clear()
+        self.stream_refresh_thread = threading.Thread(target=self.stream_refresh_loop, daemon=True)
+        self.stream_refresh_thread.start()
+    
+    def stop_stream_refresher(self):
+        self.stream_refresh_stop.set()
+    
+    def stream_refresh_loop(self):
+        """Re-resolve URLs of open files nearing expiry so reads never wait on yt-dlp"""
+        while not self.stream_refresh_stop.wait(60):
+            with self.handle_lock:
+                open_ids = {handle.video['id'] for handle in self.handles.values()}
+            
+            for video_id in self.stream_urls.expiring(open_ids, self.stream_refresh_margin):
+                if self.stream_refresh_stop.is_set():
+                    break
+                print(f"🔗 Renewing stream URL for {video_id} before it expires")
+                if self.get_stream_url(video_id, force=True):
+                    self.stream_refreshes += 1
+            
+            try:
+                self.stream_urls.save()
+            except Exception as e:
+                print(f"Error saving stream URL cache: {e}")
+    
+    def queue_preresolve(self, videos):
+        """Queue stream URL lookups for the newest videos of a listed playlist"""
+        newest = sorted(videos, key=lambda video: video['mtime'], reverse=True)[:self.preresolve_count]
+        
+        with self.preresolve_lock:
+            for video in newest:
+                video_id = video['id']
+                if video_id in self.preresolve_pending or self.stream_urls.peek(video_id):
+                    continue
+                try:
+                    self.preresolve_queue.put_nowait(video_id)
+                except queue.Full:
+                    break
+                self.preresolve_pending.add(video_id)
+            
+            if self.preresolve_pending and self.preresolve_thread is None:
+                self.preresolve_thread = threading.Thread(target=self.preresolve_loop, daemon=True)
+                self.preresolve_thread.start()
+    
+    def preresolve_loop(self):
+        """Resolve queued videos one at a time, yielding to lookups from real opens"""
+        while not self.stream_refresh_stop.is_set():
+            try:
+                video_id = self.preresolve_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            
+            # Low priority: only use the resolver while no open is waiting on it
+            while (self.stream_resolver.pending >= max(1, self.stream_resolver.workers)
+                   and not self.stream_refresh_stop.wait(0.5)):
+                pass
+            
+            try:
+                if not self.stream_urls.peek(video_id) and self.get_stream_url(video_id):
+                    self.preresolved += 1
+            finally:
+                with self.preresolve_lock:
+                    self.preresolve_pending.discard(video_id)
      # FUSE Operations
     def getattr(self, path, fh=None):
         """Get file/directory attributes"""
-        # Refresh videos if needed
-        self.refresh_videos()
-
+        # Only reads the current snapshot - refreshes run in the scheduler thread
+        snapshot = self.snapshot
+        if path in snapshot.missing:
+            # Scanners probe .nfo/folder.jpg/.srt over and over - answer from the miss cache
+            self.negative_hits += 1
+            raise FuseOSError(errno.ENOENT)
+        
         if path == '/':
             # Root directory with setgid bit (rwxrwsr-x = 2775)
             filesystem_config = self.config.get('filesystem', {})
@@ -637,34 +2335,18 @@ class YouTubeAPIFUSE(Operations):
                 # This is a playlist directory with setgid bit (rwxrwsr-x = 2775)
                 playlist_dir = path_parts[0]
                 
-                # Check if this matches any playlist's sanitized name
-                playlist_found = False
-                for playlist_id, playlist_data in self.playlists.items():
-                    if playlist_data['sanitized_name'] == playlist_dir:
-                        playlist_found = True
-                        break
-                
-                if playlist_found:
+                if playlist_dir in snapshot.dir_index:
                     filesystem_config = self.config.get('filesystem', {})
                     dir_mode = filesystem_config.get('dir_mode', 0o2775)
                     st = dict(st_mode=(stat.S_IFDIR | dir_mode), st_nlink=2)
                 else:
-                    raise FuseOSError(errno.ENOENT)
+                    raise self.note_missing(snapshot, path)
                     
             elif len(path_parts) == 2:
                 # This is a video file within a playlist directory
-                playlist_dir = path_parts[0]
-                filename = path_parts[1]
+                video = snapshot.file_index.get(path)
                 
-                # Find the playlist
-                target_playlist = None
-                for playlist_id, playlist_data in self.playlists.items():
-                    if playlist_data['sanitized_name'] == playlist_dir:
-                        target_playlist = playlist_data
-                        break
-                
-                if target_playlist and filename in target_playlist['videos']:
-                    video = target_playlist['videos'][filename]
+                if video:
                     filesystem_config = self.config.get('filesystem', {})
                     file_mode = filesystem_config.get('file_mode', 0o664)
                     st = dict(
@@ -676,9 +2358,9 @@ class YouTubeAPIFUSE(Operations):
                         st_ctime=video['mtime']
                     )
                 else:
-                    raise FuseOSError(errno.ENOENT)
+                    raise self.note_missing(snapshot, path)
             else:
-                raise FuseOSError(errno.ENOENT)
+                raise self.note_missing(snapshot, path)
 
         # Set ownership to mythtv:mythtv (configurable via config)
         filesystem_config = self.config.get('filesystem', {})
@@ -686,19 +2368,24 @@ class YouTubeAPIFUSE(Operations):
         st['st_gid'] = filesystem_config.get('gid', 130)  # mythtv group
         return st
 
+    def note_missing(self, snapshot, path):
+        """Remember that path does not exist in this snapshot; returns the ENOENT to raise"""
+        if len(snapshot.missing) < MAX_MISSING_PATHS:
+            snapshot.missing.add(path)
+        return FuseOSError(errno.ENOENT)
+    
     def readdir(self, path, fh):
         """List directory contents"""
         # Don't call refresh_videos here - it's already running in background
+        snapshot = self.snapshot
         
         if path == '/':
             # Root directory - list all playlist directories
-            if not self.playlists:
+            if not snapshot.playlists:
                 # Show a loading indicator if no playlists loaded yet
                 return ['.', '..', '.loading_playlists']
             
-            playlist_dirs = [playlist_data['sanitized_name'] 
-                           for playlist_data in self.playlists.values()]
-            return ['.', '..'] + playlist_dirs
+            return ['.', '..'] + list(snapshot.dir_index.keys())
         else:
             path_parts = path.strip('/').split('/')
             
@@ -710,75 +2397,475 @@ class YouTubeAPIFUSE(Operations):
                 if playlist_dir == '.loading_playlists':
                     raise FuseOSError(errno.ENOENT)
                 
-                # Find the playlist
-                for playlist_id, playlist_data in self.playlists.items():
-                    if playlist_data['sanitized_name'] == playlist_dir:
-                        if not playlist_data['videos']:
-                            # Show loading indicator if no videos loaded yet
-                            return ['.', '..', '.loading_videos']
-                        return ['.', '..'] + list(playlist_data['videos'].keys())
+                playlist_data = self.find_playlist(playlist_dir, snapshot)
+                if playlist_data is None:
+                    raise FuseOSError(errno.ENOENT)
                 
-                raise FuseOSError(errno.ENOENT)
+                if not playlist_data['videos']:
+                    # Show loading indicator if no videos loaded yet
+                    return ['.', '..', '.loading_videos']
+                
+                if self.preresolve_count:
+                    self.queue_preresolve(playlist_data['videos'].values())
+                return ['.', '..'] + list(playlist_data['videos'].keys())
             else:
                 raise FuseOSError(errno.ENOENT)
     
+    def find_video(self, path):
+        """Resolve a file path to its video entry (or None)"""
+        return self.snapshot.file_index.get(path)
+    
     def open(self, path, flags):
-        """Open file for reading"""
-        path_parts = path.strip('/').split('/')
+        """Open file for reading and allocate a handle with per-open state"""
+        video = self.find_video(path)
         
-        if len(path_parts) != 2:
+        if not video:
             raise FuseOSError(errno.ENOENT)
-            
-        playlist_dir = path_parts[0]
-        filename = path_parts[1]
-        
-        # Find the playlist and check if file exists
-        for playlist_id, playlist_data in self.playlists.items():
-            if playlist_data['sanitized_name'] == playlist_dir:
-                if filename in playlist_data['videos']:
-                    return hash(path) % 1000000
-                break
         
-        raise FuseOSError(errno.ENOENT)
+        handle = FileHandle(0, path, video)
+        self.attach_offline(handle)
+        
+        with self.handle_lock:
+            fh = self.next_fh
+            self.next_fh += 1
+            handle.fh = fh
+            self.handles[fh] = handle
+        return fh
+    
+    def attach_offline(self, handle):
+        """Open the offline copy for a new handle; the source is fixed for the handle's life"""
+        if not self.offline_mirror:
+            return
+        local_path = self.offline_mirror.local_path(handle.video['id'])
+        if local_path:
+            try:
+                handle.local_fd = os.open(local_path, os.O_RDONLY)
+            except FileNotFoundError:
+                pass  # Unpinned a moment ago - stream it instead
     
     def read(self, path, length, offset, fh):
         """Read data from file"""
-        path_parts = path.strip('/').split('/')
+        handle = self.handles.get(fh)
         
-        if len(path_parts) != 2:
-            raise FuseOSError(errno.ENOENT)
+        if handle is None:
+            # Read without open() (e.g. stale fh) - use throwaway state
+            video = self.find_video(path)
+            if not video:
+                raise FuseOSError(errno.ENOENT)
+            handle = FileHandle(0, path, video)
+            self.attach_offline(handle)
+        
+        chunk_size = self.chunk_cache.chunk_size
+        first_chunk = offset // chunk_size
+        last_chunk = (offset + length - 1) // chunk_size
+        
+        try:
+            # Local bytes go straight from the page cache into the reply
+            local = self.read_offline(handle, offset, length)
+            if local is not None:
+                return local
             
-        playlist_dir = path_parts[0]
-        filename = path_parts[1]
-        
-        # Find the playlist and video
-        video = None
-        for playlist_id, playlist_data in self.playlists.items():
-            if playlist_data['sanitized_name'] == playlist_dir:
-                if filename in playlist_data['videos']:
-                    video = playlist_data['videos'][filename]
-                    break
+            if handle.fh:
+                self.update_prefetch(handle, offset, length)
+            
+            local = self.read_segments(handle, offset, length, first_chunk, last_chunk)
+            if local is not None:
+                return local
+            
+            data = []
+            for chunk_index in range(first_chunk, last_chunk + 1):
+                chunk = self.get_chunk(handle, chunk_index)
+                
+                chunk_start = chunk_index * chunk_size
+                start = max(offset - chunk_start, 0)
+                end = min(offset + length - chunk_start, len(chunk))
+                data.append(chunk[start:end])
+                
+                if len(chunk) < chunk_size:
+                    break  # End of stream
+        finally:
+            if not handle.fh:
+                handle.close()
+        
+        self.save_stats()
+        return b''.join(data)
+    
+    def read_offline(self, handle, offset, length):
+        """pread from the handle's offline copy, or None if it streams"""
+        # Decided at open: a handle that started streaming never switches encodes mid-file.
+        # local_fd is set before the handle is published and only closed on release
+        if handle.local_fd is None:
+            return None
         
-        if not video:
-            raise FuseOSError(errno.ENOENT)
+        data = os.pread(handle.local_fd, length, offset)
+        self.local_reads += 1
+        self.local_read_bytes += len(data)
+        return data
+    
+    def read_segments(self, handle, offset, length, first_chunk, last_chunk):
+        """pread a range fully held by the segment cache, or None to use the chunk path"""
+        if not self.segment_cache:
+            return None
         
-        stream_url = self.get_stream_url(video['id'])
+        video_id = handle.video['id']
+        generation = self.segment_cache.covers(video_id, first_chunk, last_chunk)
+        if generation is None:
+            return None
         
-        if not stream_url:
-            raise FuseOSError(errno.EIO)
+        # Reuse the handle's fd unless the video's file was evicted and recreated since;
+        # the lock keeps another thread from closing or swapping it mid-pread
+        with handle.fd_lock:
+            if handle.segment_fd is None or handle.segment_generation != generation:
+                handle.close_segment()
+                try:
+                    handle.segment_fd = os.open(self.segment_cache.path(video_id), os.O_RDONLY)
+                except FileNotFoundError:
+                    return None
+                handle.segment_generation = generation
+            
+            data = os.pread(handle.segment_fd, length, offset)
+        self.local_reads += 1
+        self.local_read_bytes += len(data)
+        return data
+    
+    def get_chunk(self, handle, chunk_index):
+        """Return one aligned chunk of a video, from the cache or the stream"""
+        chunk = self.chunk_cache.get(handle.video['id'], chunk_index)
+        if chunk is not None:
+            return chunk
+        
+        return self.load_chunk(handle, chunk_index)
+    
+    def load_chunk(self, handle, chunk_index, prefetch=False):
+        """Download a chunk into the cache, waiting for an identical download in progress"""
+        video_id = handle.video['id']
+        key = (video_id, chunk_index)
+        
+        with self.chunk_fetch_lock:
+            in_progress = self.chunk_fetches.get(key)
+            if in_progress is None:
+                self.chunk_fetches[key] = threading.Event()
+        
+        if in_progress is not None:
+            in_progress.wait()
+            chunk = self.chunk_cache.get(video_id, chunk_index)
+            if chunk is not None:
+                return chunk
+            return self.fetch_chunk(handle, chunk_index)  # Other download failed
         
         try:
-            headers = {'Range': f'bytes={offset}-{offset + length - 1}'}
-            response = requests.get(stream_url, headers=headers, stream=True, timeout=30)
+            if self.segment_cache:
+                chunk = self.segment_cache.get(video_id, chunk_index)
+                if chunk is not None:
+                    self.chunk_cache.put(video_id, chunk_index, chunk)
+                    return chunk
             
-            if response.status_code in [200, 206]:
-                return response.content
-            else:
-                raise FuseOSError(errno.EIO)
+            chunk = self.fetch_chunk(handle, chunk_index)
+            self.chunk_cache.put(video_id, chunk_index, chunk)
+            if self.segment_cache:
+                try:
+                    self.segment_cache.put(video_id, chunk_index, chunk)
+                except OSError as e:
+                    print(f"Error writing chunk {chunk_index} of {video_id} to segment cache: {e}")
+            if prefetch:
+                self.prefetched_chunks += 1
+            return chunk
+        finally:
+            with self.chunk_fetch_lock:
+                self.chunk_fetches.pop(key).set()
+    
+    def update_prefetch(self, handle, offset, length):
+        """Track the access pattern of a file and start/stop its prefetcher"""
+        filesystem_config = self.config.get('filesystem', {})
+        chunk_size = self.chunk_cache.chunk_size
+        reader_chunk = (offset + length - 1) // chunk_size
+        
+        with self.prefetch_lock:
+            if handle.tracker is None:
+                handle.tracker = AccessTracker(filesystem_config.get('sequential_threshold', 3))
+            
+            if not handle.tracker.record(offset, length):
+                # Random access - fall back to on-demand reads
+                if handle.prefetcher:
+                    handle.prefetcher.stop()
+                    handle.prefetcher = None
+                    self.active_prefetchers -= 1
+                return
+            
+            if handle.prefetcher:
+                handle.prefetcher.advance(reader_chunk)
+                return
+            
+            if self.active_prefetchers >= filesystem_config.get('max_prefetchers', 4):
+                return
+            
+            window_bytes = filesystem_config.get('prefetch_window_mb', 32) * 1024 * 1024
+            window_chunks = -(-int(window_bytes) // chunk_size)
+            # Never prefetch more than half the cache or chunks evict each other
+            cache_chunks = self.chunk_cache.max_bytes // chunk_size
+            window_chunks = max(1, min(window_chunks, cache_chunks // 2))
+            handle.prefetcher = Prefetcher(self, handle, window_chunks)
+            self.active_prefetchers += 1
+            handle.prefetcher.start(reader_chunk)
+    
+    def prefetcher_exited(self, prefetcher):
+        """Detach a prefetcher that stopped on its own and free its slot"""
+        with self.prefetch_lock:
+            handle = prefetcher.handle
+            if handle.prefetcher is prefetcher:
+                handle.prefetcher = None
+                self.active_prefetchers -= 1
+    
+    def fetch_chunk(self, handle, chunk_index):
+        """Read one aligned chunk of a video from the handle's open HTTP response"""
+        chunk_size = self.chunk_cache.chunk_size
+        chunk_start = chunk_index * chunk_size
+        
+        with handle.lock, self.fetch_semaphore:
+            with self.inflight_lock:
+                self.inflight_fetches += 1
+            try:
+                if handle.response is not None and handle.response_offset == chunk_start:
+                    try:
+                        self.stream_reuses += 1
+                        return self.read_from_response(handle, chunk_size)
+                    except requests.RequestException as e:
+                        # Server dropped the long-lived connection - reopen below
+                        print(f"Stream for {handle.video['id']} interrupted ({e}), reopening")
                 
-        except Exception as e:
-            print(f"Error reading {path}: {e}")
+                # First read, seek or broken connection
+                self.open_stream(handle, chunk_start)
+                if handle.response is None:
+                    return b''  # Requested range starts past the end of the stream
+                return self.read_from_response(handle, chunk_size)
+                
+            except FuseOSError:
+                handle.close_response()
+                raise
+            except Exception as e:
+                print(f"Error fetching chunk {chunk_index} of {handle.video['id']}: {e}")
+                handle.close_response()
+                raise FuseOSError(errno.EIO)
+            finally:
+                with self.inflight_lock:
+                    self.inflight_fetches -= 1
+    
+    def open_stream(self, handle, offset):
+        """Open a streaming response for the handle positioned at offset"""
+        handle.close_response()
+        
+        # Cheap cache hit normally; picks up URLs renewed by the refresher
+        video_id = handle.video['id']
+        handle.stream_url = self.get_stream_url(video_id)
+        
+        if not handle.stream_url:
+            raise FuseOSError(errno.EIO)
+        
+        headers = {'Range': f'bytes={offset}-'}
+        response = self.http_get(handle.stream_url, headers=headers, stream=True)
+        self.streams_opened += 1
+        
+        if response.status_code in (403, 410):
+            # URL expired or was revoked - resolve a new one and retry once
+            response.close()
+            print(f"🔗 Stream URL for {video_id} rejected ({response.status_code}), resolving again")
+            self.stream_urls.invalidate(video_id, url=handle.stream_url)
+            self.stream_reresolutions += 1
+            handle.stream_url = self.get_stream_url(video_id)
+            if not handle.stream_url:
+                raise FuseOSError(errno.EIO)
+            response = self.http_get(handle.stream_url, headers=headers, stream=True)
+            self.streams_opened += 1
+        
+        if response.status_code == 416:
+            response.close()
+            return
+        if response.status_code not in [200, 206]:
+            response.close()
             raise FuseOSError(errno.EIO)
+        
+        # Content-Range carries the exact length of the stream
+        content_range = response.headers.get('Content-Range', '')
+        if '/' in content_range and content_range.rsplit('/', 1)[1].isdigit():
+            content_length = int(content_range.rsplit('/', 1)[1])
+            self.stream_urls.set_content_length(video_id, content_length)
+            self.record_probed_size(video_id, content_length)
+        
+        handle.response = response
+        handle.response_iter = response.iter_content(chunk_size=256 * 1024)
+        handle.response_offset = 0 if response.status_code == 200 else offset
+        
+        if handle.response_offset != offset:
+            # Server ignored the range header - skip ahead to the offset
+            self.skip_response(handle, offset)
+    
+    def skip_response(self, handle, size):
+        """Discard up to size bytes of the handle's open response without buffering them"""
+        skipped = 0
+        piece = handle.response_buffer
+        handle.response_buffer = b''
+        
+        while True:
+            if skipped + len(piece) > size:
+                # Keep only the part past the offset
+                handle.response_buffer = piece[size - skipped:]
+                skipped = size
+                break
+            skipped += len(piece)
+            if skipped == size:
+                break
+            try:
+                piece = next(handle.response_iter)
+            except StopIteration:
+                break
+        
+        handle.response_offset += skipped
+    
+    def read_from_response(self, handle, size):
+        """Pull up to size bytes from the handle's open response"""
+        data = [handle.response_buffer]
+        received = len(handle.response_buffer)
+        
+        while received < size:
+            try:
+                piece = next(handle.response_iter)
+            except StopIteration:
+                break
+            data.append(piece)
+            received += len(piece)
+        
+        data = b''.join(data)
+        handle.response_buffer = data[size:]
+        handle.response_offset += min(size, len(data))
+        return data[:size]
+    
+    def create_http_session(self):
+        """Create a keep-alive session with per-host connection pools and retries"""
+        http_config = self.config.get('http', {})
+        retry = Retry(
+            total=http_config.get('max_retries', 3),
+            backoff_factor=http_config.get('retry_backoff', 0.5),
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=['GET', 'HEAD'],
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=http_config.get('pool_connections', 4),
+            pool_maxsize=http_config.get('pool_size', 8),
+            max_retries=retry
+        )
+        
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        self.http_sessions_created += 1
+        return session
+    
+    def get_http_session(self):
+        """Return the shared HTTP session, recycling it after the idle timeout"""
+        idle_timeout = self.config.get('http', {}).get('idle_timeout', 60)
+        
+        with self.http_lock:
+            current_time = time.time()
+            if self.http_session is not None and current_time - self.http_last_used > idle_timeout:
+                # Pooled connections are probably closed by the server by now
+                self.http_session.close()
+                self.http_session = None
+            
+            if self.http_session is None:
+                self.http_session = self.create_http_session()
+            
+            self.http_last_used = current_time
+            self.http_requests += 1
+            return self.http_session
+    
+    def http_get(self, url, headers=None, stream=False):
+        """GET a URL through the shared connection pool"""
+        timeout = self.config.get('http', {}).get('timeout', 30)
+        return self.get_http_session().get(url, headers=headers, stream=stream, timeout=timeout)
+    
+    def get_stats(self):
+        """Collect runtime statistics for monitoring"""
+        return {
+            'timestamp': time.time(),
+            'chunk_cache': self.chunk_cache.get_stats(),
+            'segment_cache': self.segment_cache.get_stats() if self.segment_cache else None,
+            'offline': self.offline_mirror.get_stats() if self.offline_mirror else None,
+            'stream_urls': dict(self.stream_urls.get_stats(),
+                                resolutions=self.stream_resolutions,
+                                proactive_refreshes=self.stream_refreshes,
+                                preresolved=self.preresolved,
+                                re_resolutions=self.stream_reresolutions),
+            'extractor': self.extractor_pool.get_stats(),
+            'resolver': self.stream_resolver.get_stats(),
+            'single_flight': {
+                'stream_urls': self.stream_flights.get_stats(),
+                'playlists': self.playlist_flights.get_stats()
+            },
+            'refresh': {
+                'last_refresh': self.last_refresh,
+                'last_full_refresh': self.last_full_refresh,
+                'last_type': self.last_refresh_type,
+                'last_duration': self.last_refresh_duration,
+                'next_run': self.next_refresh_time,
+                'consecutive_failures': self.refresh_failures,
+                'playlist_fetch_times': dict(self.playlist_fetch_times)
+            },
+            'rate_limits': {
+                endpoint: bucket.get_stats()
+                for endpoint, bucket in list(self.rate_limiters.items())
+            },
+            'enrichment': {
+                'videos': len(self.enrichment),
+                'api_calls': self.enrichment_calls,
+                'sizes_probed': self.size_probes
+            },
+            'quota': {
+                'day': self.get_quota_day(),
+                'usage': self.quota_usage,
+                'calls': self.api_call_count,
+                'reset_time': self.quota_reset_time,
+                'calls_by_priority': dict(self.priority_calls),
+                'skipped_by_priority': dict(self.priority_skipped),
+                'queued_calls': self.api_scheduler.queue_length()
+            },
+            'negative_cache': {
+                'paths': len(self.snapshot.missing),
+                'hits': self.negative_hits
+            },
+            'open_files': len(self.handles),
+            'inflight_fetches': self.inflight_fetches,
+            'local_reads': {
+                'reads': self.local_reads,
+                'bytes': self.local_read_bytes
+            },
+            'prefetch': {
+                'active_prefetchers': self.active_prefetchers,
+                'prefetched_chunks': self.prefetched_chunks
+            },
+            'http': {
+                'requests': self.http_requests,
+                'sessions_created': self.http_sessions_created,
+                'streams_opened': self.streams_opened,
+                'stream_reuses': self.stream_reuses
+            }
+        }
+    
+    def save_stats(self, force=False):
+        """Write runtime statistics for the dashboard (at most every 10 seconds)"""
+        current_time = time.time()
+        if not force and current_time - self.last_stats_write < 10:
+            return
+        if not self.stats_lock.acquire(blocking=force):
+            return  # Another thread is writing them right now
+        
+        try:
+            self.last_stats_write = current_time
+            write_json_atomic(self.stats_file, self.get_stats())
+        except Exception as e:
+            print(f"Error writing stats file {self.stats_file}: {e}")
+        finally:
+            self.stats_lock.release()
 
     # Write operations (read-only filesystem - return appropriate errors)
     def write(self, path, data, offset, fh):
@@ -834,13 +2921,43 @@ class YouTubeAPIFUSE(Operations):
         return 0
     
     def release(self, path, fh):
-        """Release file handle - no-op for read-only content"""
+        """Release file handle and free its prefetcher and HTTP response"""
+        with self.handle_lock:
+            handle = self.handles.pop(fh, None)
+        
+        if handle:
+            with self.prefetch_lock:
+                prefetcher, handle.prefetcher = handle.prefetcher, None
+                if prefetcher:
+                    self.active_prefetchers -= 1
+            # Outside prefetch_lock: closing waits for any chunk download in flight
+            if prefetcher:
+                prefetcher.stop()
+            handle.close()
         return 0
     
     def fsync(self, path, datasync, fh):
         """Sync file - no-op for read-only content"""
         return 0
     
+    def destroy(self, path):
+        """Unmount - stop background work and flush persistent state"""
+        self.stop_refresh_scheduler()
+        self.stop_stream_refresher()
+        if self.offline_mirror:
+            self.offline_mirror.stop()
+        self.stream_resolver.shutdown()
+        self.extractor_pool.close()
+        if self.segment_cache:
+            self.segment_cache.save()
+        self.quota_ledger.flush()
+        try:
+            self.stream_urls.save()
+        except Exception as e:
+            print(f"Error saving stream URL cache: {e}")
+        self.save_metadata_cache()
+        self.save_stats(force=True)
+    
     def access(self, path, mode):
         """Check access permissions"""
         # Allow read access, deny write access
@@ -891,7 +3008,8 @@ class YouTubeAPIFUSE(Operations):
                 return request.execute()
 
             try:
-                response = self.make_api_call("check_playlist_list", api_call, quota_cost=1)
+                response = self.make_api_call("check_playlist_list", api_call, quota_cost=1, endpoint='playlists',
+                                              priority=PRIORITY_CHANGE_DETECTION)
                 
                 if response:
                     # Store new ETag for future checks
@@ -915,7 +3033,11 @@ class YouTubeAPIFUSE(Operations):
                             # Remove from caches
                             self.playlist_etags.pop(playlist_id, None)
                             self.playlist_modified_times.pop(playlist_id, None)
-                            self.playlists.pop(playlist_id, None)
+                        self.publish_playlists({
+                            playlist_id: playlist_data
+                            for playlist_id, playlist_data in self.playlists.items()
+                            if playlist_id not in deleted_playlists
+                        })
                     
                     # Check existing playlists for modifications
                     for item in response.get('items', []):
@@ -980,7 +3102,8 @@ class YouTubeAPIFUSE(Operations):
                 
                 return request.execute()
 
-            response = self.make_api_call(f"check_playlist_changes({playlist_id})", api_call, quota_cost=1)
+            response = self.make_api_call(f"check_playlist_changes({playlist_id})", api_call, quota_cost=1,
+                                          endpoint='playlistItems', priority=PRIORITY_CHANGE_DETECTION)
             
             if response:
                 # Store new ETag
@@ -1006,16 +3129,15 @@ class YouTubeAPIFUSE(Operations):
                 print(f"Error checking playlist {playlist_id}: {e}")
                 return True  # Assume changed on error to be safe
     
-    def refresh_videos_incremental(self):
+    def refresh_videos_incremental(self, check_interval=True):
         """Incrementally refresh only changed playlists to save quota"""
         current_time = time.time()
         quota_config = self.config.get('quota_management', {})
-        cache_duration = quota_config.get('cache_duration', 3600)
         
         # Use cache duration from quota config if available
-        effective_refresh_interval = min(self.refresh_interval, cache_duration)
+        effective_refresh_interval = self.get_effective_refresh_interval()
         
-        if current_time - self.last_refresh < effective_refresh_interval:
+        if check_interval and current_time - self.last_refresh < effective_refresh_interval:
             return  # Too soon to refresh
 
         # Check if we're in emergency mode
@@ -1036,76 +3158,26 @@ class YouTubeAPIFUSE(Operations):
         
         print(f"🔄 Refreshing {len(changed_playlists)} changed playlists...")
         
+        # Work on a copy so readers keep a consistent view until we publish
+        new_playlists = dict(self.playlists)
+        
         # Only refresh changed playlists
+        playlist_jobs = {}
         for playlist_id in changed_playlists:
             if playlist_id == 'watch_later':
                 # Handle Watch Later specially
-                print("📺 Refreshing Watch Later playlist...")
-                watch_later_videos = self.get_watch_later_playlist()
-                
-                if playlist_id not in self.playlists:
-                    self.playlists[playlist_id] = {
-                        'title': 'Watch Later',
-                        'sanitized_name': 'Watch_Later',
-                        'videos': {}
-                    }
-                
-                # Clear old videos and add new ones
-                self.playlists[playlist_id]['videos'] = {}
-                for video in watch_later_videos:
-                    filename = f"{self.sanitize_filename(video['title'])}.mp4"
-                    self.playlists[playlist_id]['videos'][filename] = self.create_video_entry(video)
-            
+                playlist_jobs[playlist_id] = self.fetch_watch_later
             else:
-                # Handle regular playlists
-                print(f"📋 Refreshing playlist {playlist_id}...")
-                
-                # Get playlist metadata if needed
-                if playlist_id not in self.playlists:
-                    # Check for custom playlist title first
-                    playlist_config = self.config.get('playlists', {})
-                    custom_titles = playlist_config.get('playlist_titles', {})
-                    if playlist_id in custom_titles:
-                        playlist_title = custom_titles[playlist_id]
-                        print(f"📝 Using custom title for {playlist_id}: {playlist_title}")
-                    else:
-                        # Get playlist metadata from API
-                        def get_metadata():
-                            return self.youtube_service.playlists().list(
-                                part='snippet',
-                                id=playlist_id
-                            ).execute()
-                        
-                        try:
-                            playlist_response = self.make_api_call(f"get_playlist_metadata({playlist_id})", get_metadata, quota_cost=1)
-                            
-                            if playlist_response and playlist_response['items']:
-                                playlist_title = playlist_response['items'][0]['snippet']['title']
-                            else:
-                                playlist_title = f"Playlist_{playlist_id}"
-                        except Exception as e:
-                            print(f"Error getting playlist metadata for {playlist_id}: {e}")
-                            playlist_title = f"Playlist_{playlist_id}"
-                    
-                    sanitized_name = self.sanitize_filename(playlist_title)
-                    self.playlists[playlist_id] = {
-                        'title': playlist_title,
-                        'sanitized_name': sanitized_name,
-                        'videos': {}
-                    }
-                
-                # Refresh videos for this playlist
-                playlist_videos = self.get_playlist_videos(playlist_id)
-                
-                # Clear old videos and add new ones
-                self.playlists[playlist_id]['videos'] = {}
-                for video in playlist_videos:
-                    filename = f"{self.sanitize_filename(video['title'])}.mp4"
-                    self.playlists[playlist_id]['videos'][filename] = self.create_video_entry(video)
+                playlist_jobs[playlist_id] = lambda playlist_id=playlist_id: self.fetch_custom_playlist(
+                    playlist_id, existing=new_playlists.get(playlist_id))
         
+        # Replace old videos with new ones (failed fetches keep their old entry)
+        new_playlists.update(self.fetch_playlists_concurrently(playlist_jobs))
+        
+        self.publish_playlists(new_playlists)
         self.last_refresh = current_time
-        total_videos = sum(len(playlist['videos']) for playlist in self.playlists.values())
-        print(f"✅ Incremental refresh complete: {len(self.playlists)} playlists with {total_videos} total videos")
+        total_videos = sum(len(playlist['videos']) for playlist in new_playlists.values())
+        print(f"✅ Incremental refresh complete: {len(new_playlists)} playlists with {total_videos} total videos")
         print(f"📊 Final quota usage: {self.quota_usage}/{quota_config.get('daily_quota_limit', 10000)}")
         print(f"💰 Saved quota by only refreshing {len(changed_playlists)} changed playlists!")
 
@@ -1133,23 +3205,26 @@ def main():
         
         # Start background refresh after FUSE system is initialized
         print("🔄 Starting background playlist refresh...")
-        fuse_system.refresh_thread = threading.Thread(target=fuse_system.refresh_videos, daemon=True)
-        if force_full_refresh:
-            fuse_system.refresh_thread = threading.Thread(
-                target=lambda: fuse_system.refresh_videos(force_full_refresh=True), 
-                daemon=True
-            )
-        fuse_system.refresh_thread.start()
+        fuse_system.start_refresh_scheduler(force_full_refresh=force_full_refresh)
+        fuse_system.start_stream_refresher()
+        if fuse_system.offline_mirror:
+            fuse_system.offline_mirror.start()
         
         # Mount with appropriate options for media center use
+        filesystem_config = fuse_system.config.get('filesystem', {})
+        multithreaded = filesystem_config.get('multithreaded', False)
         mount_options = {
-            'nothreads': True,
+            'nothreads': not multithreaded,
             'foreground': True,
             'allow_other': True,
             'default_permissions': False,
             'ro': False,  # Not read-only at mount level
             'big_writes': True,  # Enable big writes
             'max_read': 131072,  # 128KB read buffer
+            # Let the kernel answer repeated probes for missing files itself
+            'negative_timeout': filesystem_config.get('negative_timeout', 30),
+            'entry_timeout': filesystem_config.get('entry_timeout', 1),
+            'attr_timeout': filesystem_config.get('attr_timeout', 1),
         }
         
         print(f"🔧 Mount options: {mount_options}")
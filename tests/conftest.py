@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""
+Shared pytest setup - makes the modules in src/ importable from tests/
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the in-memory chunk cache (LRU order, byte budget)
+"""
+
+import pytest
+
+try:
+    from youtube_api_fuse import ChunkCache
+except OSError:  # fusepy raises it when libfuse is missing
+    pytest.skip("libfuse not available", allow_module_level=True)
+
+CHUNK = 1024
+
+def test_get_counts_hits_and_misses():
+    cache = ChunkCache(CHUNK, 4 * CHUNK)
+    cache.put('vid', 0, b'a' * CHUNK)
+    
+    assert cache.get('vid', 0) == b'a' * CHUNK
+    assert cache.get('vid', 1) is None
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 50.0)
+
+def test_evicts_least_recently_used_chunk():
+    cache = ChunkCache(CHUNK, 2 * CHUNK)
+    cache.put('vid', 0, b'0' * CHUNK)
+    cache.put('vid', 1, b'1' * CHUNK)
+    cache.get('vid', 0)  # Chunk 1 is now the oldest
+    cache.put('vid', 2, b'2' * CHUNK)
+    
+    assert cache.contains('vid', 0)
+    assert not cache.contains('vid', 1)
+    assert cache.contains('vid', 2)
+    assert cache.current_bytes == 2 * CHUNK
+    assert cache.get_stats()['evictions'] == 1
+
+def test_replacing_a_chunk_does_not_double_count():
+    cache = ChunkCache(CHUNK, 2 * CHUNK)
+    cache.put('vid', 0, b'a' * CHUNK)
+    cache.put('vid', 0, b'b' * 10)
+    
+    assert cache.current_bytes == 10
+    assert cache.get('vid', 0) == b'b' * 10
+
+def test_oversized_and_empty_chunks_are_not_cached():
+    cache = ChunkCache(CHUNK, 2 * CHUNK)
+    cache.put('vid', 0, b'x' * (3 * CHUNK))
+    cache.put('vid', 1, b'')
+    
+    assert cache.current_bytes == 0
+    assert not cache.contains('vid', 0)
+    assert not cache.contains('vid', 1)
+
+def test_invalidate_drops_only_that_video():
+    cache = ChunkCache(CHUNK, 4 * CHUNK)
+    cache.put('a', 0, b'a' * CHUNK)
+    cache.put('a', 1, b'a' * CHUNK)
+    cache.put('b', 0, b'b' * CHUNK)
+    cache.invalidate('a')
+    
+    assert not cache.contains('a', 0)
+    assert cache.contains('b', 0)
+    assert cache.current_bytes == CHUNK
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Unit tests for parsing YouTube contentDetails durations
+"""
+
+import pytest
+
+try:
+    from youtube_api_fuse import parse_iso8601_duration
+except OSError:  # fusepy raises it when libfuse is missing
+    pytest.skip("libfuse not available", allow_module_level=True)
+
+@pytest.mark.parametrize('duration, seconds', [
+    ('PT1H2M3S', 3723),
+    ('PT45S', 45),
+    ('PT10M', 600),
+    ('PT2H', 7200),
+    ('P1DT1S', 86401),
+    ('P0D', 0),  # Live streams and premieres
+])
+def test_parses_durations(duration, seconds):
+    assert parse_iso8601_duration(duration) == seconds
+
+@pytest.mark.parametrize('duration', [None, '', '1H2M', 'PT1.5S', 'PT1H junk'])
+def test_rejects_malformed_durations(duration):
+    assert parse_iso8601_duration(duration) is None
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the background prefetcher's slot accounting
+"""
+
+import threading
+import pytest
+from types import SimpleNamespace
+
+try:
+    from youtube_api_fuse import ChunkCache, FileHandle, Prefetcher, YouTubeAPIFUSE
+except OSError:  # fusepy raises it when libfuse is missing
+    pytest.skip("libfuse not available", allow_module_level=True)
+
+def make_fuse_system(load_chunk):
+    fuse_system = SimpleNamespace(
+        chunk_cache=ChunkCache(1024, 8 * 1024),
+        segment_cache=None,
+        load_chunk=load_chunk,
+        prefetch_lock=threading.Lock(),
+        active_prefetchers=1
+    )
+    fuse_system.prefetcher_exited = lambda prefetcher: YouTubeAPIFUSE.prefetcher_exited(fuse_system, prefetcher)
+    return fuse_system
+
+def test_failed_prefetcher_frees_its_slot():
+    def load_chunk(handle, chunk_index, prefetch=False):
+        raise RuntimeError("stream URL expired")
+    
+    fuse_system = make_fuse_system(load_chunk)
+    handle = FileHandle(1, '/P/a.mp4', {'id': 'vid'})
+    handle.prefetcher = Prefetcher(fuse_system, handle, window_chunks=4)
+    prefetcher = handle.prefetcher
+    prefetcher.start(0)
+    prefetcher.thread.join(timeout=5)
+    
+    assert not prefetcher.thread.is_alive()
+    assert handle.prefetcher is None
+    assert fuse_system.active_prefetchers == 0
+
+def test_replaced_prefetcher_does_not_free_the_new_slot():
+    fuse_system = make_fuse_system(None)
+    handle = FileHandle(1, '/P/a.mp4', {'id': 'vid'})
+    old = Prefetcher(fuse_system, handle, window_chunks=4)
+    handle.prefetcher = Prefetcher(fuse_system, handle, window_chunks=4)
+    
+    fuse_system.prefetcher_exited(old)
+    
+    assert handle.prefetcher is not None
+    assert fuse_system.active_prefetchers == 1
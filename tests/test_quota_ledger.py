@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the quota ledger and the Pacific-time quota day
+"""
+
+import json
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytz
+
+try:
+    from youtube_api_fuse import QuotaLedger, YouTubeAPIFUSE
+except OSError:  # fusepy raises it when libfuse is missing
+    pytest.skip("libfuse not available", allow_module_level=True)
+
+def entry(day, cost):
+    return json.dumps({'ts': 0, 'day': day, 'op': 'playlist_items', 'cost': cost}) + '\n'
+
+def test_missing_ledger_is_empty(tmp_path):
+    assert QuotaLedger(str(tmp_path / 'quota.jsonl')).load('2025-06-01') == (0, 0)
+
+def test_record_and_load_round_trip(tmp_path):
+    path = str(tmp_path / 'quota.jsonl')
+    ledger = QuotaLedger(path)
+    ledger.record('2025-06-01', 'playlist_items', 1)
+    ledger.record('2025-06-01', 'search', 100)
+    ledger.record('2025-05-31', 'playlist_items', 1)
+    ledger.flush()
+    
+    assert QuotaLedger(path).load('2025-06-01') == (101, 2)
+
+def test_torn_line_is_skipped_and_compacted(tmp_path):
+    path = tmp_path / 'quota.jsonl'
+    path.write_text(entry('2025-06-01', 1) + entry('2025-06-01', 1)[:20])
+    
+    ledger = QuotaLedger(str(path))
+    assert ledger.load('2025-06-01') == (1, 1)
+    assert path.read_text() == entry('2025-06-01', 1)
+
+def test_entry_missing_newline_does_not_swallow_next_entry(tmp_path):
+    path = tmp_path / 'quota.jsonl'
+    path.write_text(entry('2025-06-01', 1).rstrip('\n'))
+    
+    ledger = QuotaLedger(str(path))
+    assert ledger.load('2025-06-01') == (1, 1)
+    ledger.record('2025-06-01', 'search', 100)
+    ledger.flush()
+    
+    assert QuotaLedger(str(path)).load('2025-06-01') == (101, 2)
+
+def test_old_days_are_dropped(tmp_path):
+    path = tmp_path / 'quota.jsonl'
+    path.write_text(entry('2025-01-01', 5) + entry('2025-05-30', 2))
+    
+    assert QuotaLedger(str(path), keep_days=30).load('2025-06-01') == (0, 0)
+    assert path.read_text() == entry('2025-05-30', 2)
+
+@pytest.mark.parametrize('reset, day', [
+    ((2025, 6, 1), '2025-05-31'),
+    ((2025, 3, 10), '2025-03-09'),  # 23-hour day: DST starts on the 9th
+    ((2025, 11, 3), '2025-11-02'),  # 25-hour day: DST ends on the 2nd
+])
+def test_quota_day_across_dst(reset, day):
+    reset_time = pytz.timezone('US/Pacific').localize(datetime(*reset)).timestamp()
+    fuse = SimpleNamespace(quota_reset_time=reset_time)
+    assert YouTubeAPIFUSE.get_quota_day(fuse) == day
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the token bucket shared by the filesystem and the playlist tools
+"""
+
+import threading
+
+import rate_limiting
+from rate_limiting import TokenBucket
+
+class FakeClock:
+    """Stands in for time.monotonic and time.sleep so the tests never wait"""
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+    
+    def monotonic(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+def make_bucket(monkeypatch, rate, burst):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiting.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(rate_limiting.time, 'sleep', clock.sleep)
+    return TokenBucket(rate, burst), clock
+
+def test_burst_is_free_then_calls_are_spaced(monkeypatch):
+    bucket, clock = make_bucket(monkeypatch, rate=2, burst=3)
+    
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == 0.5
+    assert bucket.acquire() == 0.5
+    assert clock.slept == [0.5, 0.5]
+    stats = bucket.get_stats()
+    assert (stats['acquired'], stats['waits'], stats['max_wait']) == (5, 2, 0.5)
+
+def test_tokens_refill_up_to_burst(monkeypatch):
+    bucket, clock = make_bucket(monkeypatch, rate=1, burst=2)
+    bucket.acquire()
+    bucket.acquire()
+    clock.now += 60  # A long idle period only refills the burst
+    
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 1.0
+
+def test_zero_rate_is_unlimited(monkeypatch):
+    bucket, clock = make_bucket(monkeypatch, rate=0, burst=1)
+    
+    assert all(bucket.acquire() == 0.0 for _ in range(100))
+    assert clock.slept == []
+
+def test_concurrent_callers_reserve_distinct_slots(monkeypatch):
+    bucket, _ = make_bucket(monkeypatch, rate=10, burst=1)
+    monkeypatch.setattr(rate_limiting.time, 'sleep', lambda seconds: None)
+    waits = []
+    lock = threading.Lock()
+    
+    def worker():
+        wait = bucket.acquire()
+        with lock:
+            waits.append(round(wait, 6))
+    
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    # The clock stands still, so each caller queues one token behind the previous one
+    assert sorted(waits) == [0.0, 0.1, 0.2, 0.3, 0.4]
+
+def test_from_config():
+    bucket = TokenBucket.from_config({'rate_limit_delay': 0.5, 'rate_limit_burst': 4})
+    assert (bucket.rate, bucket.burst) == (2.0, 4)
+    
+    bucket = TokenBucket.from_config({'rate_limit_per_second': 7, 'rate_limit_delay': 0.5})
+    assert (bucket.rate, bucket.burst) == (7, 5)
+    
+    assert TokenBucket.from_config({'rate_limit_delay': 0}).rate == 0
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the on-disk segment cache (budget, eviction, restart)
+"""
+
+import os
+import pytest
+
+try:
+    from youtube_api_fuse import SegmentCache
+except OSError:  # fusepy raises it when libfuse is missing
+    pytest.skip("libfuse not available", allow_module_level=True)
+
+CHUNK = 1024
+
+def make_cache(tmp_path, max_chunks):
+    cache = SegmentCache(str(tmp_path / 'segments'), CHUNK, max_chunks * CHUNK)
+    cache.load()
+    return cache
+
+def test_round_trip(tmp_path):
+    cache = make_cache(tmp_path, 8)
+    cache.put('vid', 2, b'a' * CHUNK)
+    assert cache.get('vid', 2) == b'a' * CHUNK
+    assert cache.get('vid', 1) is None
+    assert cache.covers('vid', 2, 2) is not None
+    assert cache.covers('vid', 1, 2) is None
+
+def test_single_video_never_exceeds_budget(tmp_path):
+    cache = make_cache(tmp_path, 4)
+    for chunk_index in range(10):
+        cache.put('big', chunk_index, b'x' * CHUNK)
+    
+    assert cache.current_bytes <= cache.max_bytes
+    assert os.path.getsize(cache.path('big')) <= cache.max_bytes
+    assert cache.get_stats()['oversized'] == 6
+
+def test_evicts_least_recently_used_video(tmp_path):
+    cache = make_cache(tmp_path, 4)
+    cache.put('old', 0, b'o' * CHUNK)
+    cache.put('old', 1, b'o' * CHUNK)
+    cache.put('new', 0, b'n' * CHUNK)
+    cache.get('old', 0)  # 'old' is now the most recently used
+    cache.put('third', 0, b't' * CHUNK)
+    cache.put('third', 1, b't' * CHUNK)
+    
+    assert 'new' not in cache.videos
+    assert not os.path.exists(cache.path('new'))
+    assert cache.get('old', 1) == b'o' * CHUNK
+    assert cache.current_bytes <= cache.max_bytes
+
+def test_short_last_chunk_ends_coverage(tmp_path):
+    cache = make_cache(tmp_path, 8)
+    cache.put('vid', 0, b'a' * CHUNK)
+    cache.put('vid', 1, b'b' * 10)
+    # Nothing exists past a short chunk, so a range running past EOF is still covered
+    assert cache.covers('vid', 0, 3) is not None
+
+def test_index_survives_restart(tmp_path):
+    cache = make_cache(tmp_path, 8)
+    cache.put('vid', 0, b'a' * CHUNK)
+    cache.put('vid', 3, b'd' * CHUNK)
+    cache.save()
+    
+    restored = make_cache(tmp_path, 8)
+    assert restored.current_bytes == 2 * CHUNK
+    assert restored.get('vid', 3) == b'd' * CHUNK
+
+def test_chunk_size_change_discards_files(tmp_path):
+    cache = make_cache(tmp_path, 8)
+    cache.put('vid', 0, b'a' * CHUNK)
+    cache.save()
+    
+    resized = SegmentCache(str(tmp_path / 'segments'), CHUNK * 2, 8 * CHUNK)
+    assert resized.load() == 0
+    assert not os.path.exists(cache.path('vid'))
+
+def test_recreated_file_gets_new_generation(tmp_path):
+    cache = make_cache(tmp_path, 8)
+    cache.put('vid', 0, b'a' * CHUNK)
+    first = cache.covers('vid', 0, 0)
+    cache.invalidate('vid')
+    cache.put('vid', 0, b'b' * CHUNK)
+    assert cache.covers('vid', 0, 0) != first
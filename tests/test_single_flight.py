@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Unit tests for coalescing concurrent lookups of the same key
+"""
+
+import threading
+import time
+import pytest
+
+try:
+    from youtube_api_fuse import SingleFlight
+except OSError:  # fusepy raises it when libfuse is missing
+    pytest.skip("libfuse not available", allow_module_level=True)
+
+def run_concurrently(flight, key, func, callers):
+    """Start callers that all join the leader's call; returns their results or errors"""
+    results = []
+    lock = threading.Lock()
+    
+    def caller():
+        try:
+            result = flight.do(key, func)
+        except Exception as e:
+            result = e
+        with lock:
+            results.append(result)
+    
+    threads = [threading.Thread(target=caller) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+def wait_for_followers(flight, count):
+    for _ in range(1000):
+        if flight.get_stats()['shared'] == count:
+            return
+        time.sleep(0.01)
+    raise AssertionError("followers never joined the call")
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    
+    def lookup():
+        calls.append(1)
+        release.wait()
+        return 'url'
+    
+    threads, results = run_concurrently(flight, 'vid', lookup, 4)
+    wait_for_followers(flight, 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+    
+    assert calls == [1]
+    assert results == ['url'] * 4
+    assert flight.get_stats() == {'in_flight': 0, 'executed': 1, 'shared': 3}
+
+def test_error_reaches_every_caller_and_is_not_cached():
+    flight = SingleFlight()
+    release = threading.Event()
+    
+    def failing():
+        release.wait()
+        raise RuntimeError("extraction failed")
+    
+    threads, results = run_concurrently(flight, 'vid', failing, 3)
+    wait_for_followers(flight, 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+    
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.do('vid', lambda: 'retried') == 'retried'
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 1) == 1
+    assert flight.do('b', lambda: 2) == 2
+    assert flight.get_stats()['shared'] == 0
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the stream URL cache (expiry parsing, LRU bound, persistence)
+"""
+
+import time
+import pytest
+
+try:
+    from youtube_api_fuse import StreamUrlCache
+except OSError:  # fusepy raises it when libfuse is missing
+    pytest.skip("libfuse not available", allow_module_level=True)
+
+def make_cache(tmp_path, **kwargs):
+    return StreamUrlCache(str(tmp_path / 'stream_urls.json'), **kwargs)
+
+def url(expires, style='query'):
+    if style == 'query':
+        return f'https://r1.googlevideo.com/videoplayback?expire={int(expires)}&itag=18'
+    return f'https://r1.googlevideo.com/videoplayback/expire/{int(expires)}/itag/18/'
+
+def test_parse_expiry_from_query_and_path(tmp_path):
+    cache = make_cache(tmp_path)
+    assert cache.parse_expiry(url(1700000000)) == 1700000000
+    assert cache.parse_expiry(url(1700000000, style='path')) == 1700000000
+
+@pytest.mark.parametrize('bad_url', [
+    'https://example.com/video.mp4',
+    'https://r1.googlevideo.com/videoplayback?expire=soon',
+    'https://r1.googlevideo.com/videoplayback/expire',
+])
+def test_parse_expiry_falls_back_to_default_ttl(tmp_path, bad_url):
+    cache = make_cache(tmp_path, default_ttl=1800)
+    before = time.time()
+    assert before + 1800 <= cache.parse_expiry(bad_url) <= time.time() + 1800
+
+def test_entries_inside_the_expiry_margin_are_misses(tmp_path):
+    cache = make_cache(tmp_path, expiry_margin=60)
+    fresh = url(time.time() + 3600)
+    cache.put('fresh', fresh)
+    cache.put('closing', url(time.time() + 30))
+    
+    assert cache.get('fresh')['url'] == fresh
+    assert cache.get('closing') is None
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+def test_lru_bound_and_expired_eviction(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    expires = time.time() + 3600
+    cache.put('a', url(expires))
+    cache.put('b', url(expires))
+    cache.get('a')  # b is now the least recently used
+    cache.put('c', url(expires))
+    cache.put('dead', url(time.time() - 1))
+    
+    assert sorted(cache.entries) == ['a', 'c']
+    assert cache.get_stats()['evictions'] == 2
+
+def test_invalidate_only_drops_the_given_url(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put('vid', url(time.time() + 3600))
+    cache.invalidate('vid', url='https://old.example/')
+    assert cache.peek('vid') is not None
+    
+    cache.invalidate('vid', url=cache.peek('vid')['url'])
+    assert cache.peek('vid') is None
+
+def test_save_and_load_keep_unexpired_entries(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put('live', url(time.time() + 3600), content_length=1234)
+    cache.put('dead', url(time.time() + 3600))
+    cache.entries['dead']['expires'] = time.time() - 1
+    cache.save()
+    
+    restored = make_cache(tmp_path)
+    assert restored.load() == 1
+    assert restored.peek('live')['content_length'] == 1234
@@ -150,7 +150,10 @@ class YouTubeFUSEDashboard:
                 'incremental_refreshes': efficiency_report['summary']['incremental_refreshes'],
                 'full_refreshes': efficiency_report['summary']['full_refreshes'],
                 'recent_avg_quota': efficiency_report['recent_activity']['avg_quota_per_refresh'],
-                'recent_efficiency': efficiency_report['recent_activity']['avg_efficiency_ratio']
+                'recent_efficiency': efficiency_report['recent_activity']['avg_efficiency_ratio'],
+                'actual_quota_day': efficiency_report['actual_usage']['quota_day'],
+                'actual_quota_used': efficiency_report['actual_usage']['quota_used'],
+                'actual_api_calls': efficiency_report['actual_usage']['api_calls']
             }
         except Exception as e:
             return {
@@ -160,6 +163,20 @@ class YouTubeFUSEDashboard:
                 'efficiency_rate': 0
             }
     
+    def get_fuse_stats(self):
+        """Get runtime statistics exported by the running FUSE filesystem"""
+        config = self.load_config()
+        stats_file = config.get('stats_file', 'fuse_stats.json')
+        
+        try:
+            with open(stats_file, 'r') as f:
+                stats = json.load(f)
+            stats['available'] = True
+            stats['age'] = time.time() - stats.get('timestamp', 0)
+            return stats
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {'available': False}
+    
     def get_playlist_info(self):
         """Get playlist configuration and discovered playlists"""
         config = self.load_config()
@@ -254,6 +271,7 @@ def api_status():
         'system': dashboard.get_system_status(),
         'quota': dashboard.get_quota_status(),
         'quota_efficiency': dashboard.get_quota_efficiency_status(),
+        'performance': dashboard.get_fuse_stats(),
         'playlists': dashboard.get_playlist_info(),
         'timestamp': datetime.now().isoformat()
     })
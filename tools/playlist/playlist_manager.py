@@ -11,6 +11,11 @@ from googleapiclient.discovery import build
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 
+# Share the filesystem's token bucket so tools respect the same API rate limits
+# (rate_limiting has no fusepy/yt-dlp dependencies, so this works on the dashboard host)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src'))
+from rate_limiting import TokenBucket
+
 def load_config(config_file='youtube_config.json'):
     """Load configuration file"""
     try:
@@ -46,13 +51,19 @@ def get_youtube_service(config):
     
     return build('youtube', 'v3', credentials=creds)
 
-def discover_playlists(youtube_service):
+def get_rate_limiter(config):
+    """Token bucket configured like the filesystem's"""
+    return TokenBucket.from_config(config.get('quota_management', {}))
+
+def discover_playlists(youtube_service, rate_limiter=None):
     """Discover all user playlists"""
     playlists = []
     next_page_token = None
     
     try:
         while True:
+            if rate_limiter:
+                rate_limiter.acquire()
             request = youtube_service.playlists().list(
                 part='snippet,contentDetails',
                 mine=True,
@@ -90,7 +101,7 @@ def list_playlists():
         return
     
     print("🔍 Discovering your playlists...")
-    playlists = discover_playlists(youtube_service)
+    playlists = discover_playlists(youtube_service, get_rate_limiter(config))
     
     if not playlists:
         print("No playlists found")
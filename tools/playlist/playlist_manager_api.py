@@ -11,6 +11,7 @@ import argparse
 from googleapiclient.discovery import build
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
+from playlist_manager import get_rate_limiter
 
 def load_config(config_file='youtube_config.json'):
     """Load configuration file"""
@@ -47,9 +48,11 @@ def discover_playlists_json():
     
     playlists = []
     next_page_token = None
+    rate_limiter = get_rate_limiter(config)
     
     try:
         while True:
+            rate_limiter.acquire()
             request = youtube_service.playlists().list(
                 part='snippet,contentDetails',
                 mine=True,
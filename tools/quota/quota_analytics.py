@@ -33,6 +33,32 @@ class QuotaAnalytics:
                 }
             }
     
+    def get_ledger_file(self):
+        """Locate the quota ledger written by the FUSE filesystem"""
+        try:
+            with open(self.config_file, 'r') as f:
+                cache_dir = json.load(f).get('cache_dir', 'cache')
+        except (FileNotFoundError, json.JSONDecodeError):
+            cache_dir = 'cache'
+        return os.path.join(cache_dir, 'quota_ledger.jsonl')
+    
+    def load_quota_ledger(self):
+        """Load actual per-quota-day usage {day: {'quota': n, 'calls': n}} from the ledger"""
+        ledger = {}
+        try:
+            with open(self.get_ledger_file(), 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    day = ledger.setdefault(entry['day'], {'quota': 0, 'calls': 0})
+                    day['quota'] += entry['cost']
+                    day['calls'] += 1
+        except FileNotFoundError:
+            pass
+        return ledger
+    
     def save_analytics(self):
         """Save analytics data to file"""
         with open(self.analytics_file, 'w') as f:
@@ -92,7 +118,16 @@ class QuotaAnalytics:
             if r['timestamp'] > time.time() - (7 * 24 * 60 * 60)  # Last 7 days
         ]
         
+        ledger = self.load_quota_ledger()
+        latest_day = max(ledger) if ledger else None
+        
         report = {
+            'actual_usage': {
+                'quota_day': latest_day,
+                'quota_used': ledger[latest_day]['quota'] if latest_day else 0,
+                'api_calls': ledger[latest_day]['calls'] if latest_day else 0,
+                'daily': ledger
+            },
             'summary': {
                 'total_quota_saved': savings['total_saved'],
                 'incremental_refreshes': savings['incremental_refreshes'],
@@ -138,13 +173,22 @@ class QuotaAnalytics:
             print(f"\n🎉 Incremental refresh has saved you {report['summary']['total_quota_saved']} quota units!")
             print("   This means more API calls available for other operations.")
         
-        # Daily usage chart
+        # Daily usage chart - prefer actual ledger numbers over refresh estimates
+        daily_usage = dict(self.analytics['daily_usage'])
+        for date_str, usage in report['actual_usage']['daily'].items():
+            daily_usage[date_str] = usage['quota']
+        
         recent_usage = {}
-        for date_str, usage in self.analytics['daily_usage'].items():
+        for date_str, usage in daily_usage.items():
             date_obj = datetime.strptime(date_str, '%Y-%m-%d')
             if date_obj > datetime.now() - timedelta(days=7):
                 recent_usage[date_str] = usage
         
+        if report['actual_usage']['quota_day']:
+            actual = report['actual_usage']
+            print(f"\n📒 Actual Usage ({actual['quota_day']} Pacific): "
+                  f"{actual['quota_used']} units in {actual['api_calls']} calls")
+        
         if recent_usage:
             print(f"\n📅 Daily Quota Usage (Last 7 Days)")
             for date_str in sorted(recent_usage.keys()):